@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class CacheBackend:
+    """
+    Interface of the repository caches.
+    Keys are tuples whose first element is a namespace ('profile', 'offerings', 'phone',
+    'search'); invalidate_namespace() drops every key of one namespace at once.
+    """
+
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    def set(self, key, value, token=None):
+        """Store `value`; if `token` (from token()) is stale, a write raced the load and it is dropped"""
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def invalidate_namespace(self, namespace: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+    def token(self, key):
+        """Invalidation state of `key`, captured before loading it"""
+        return None
+
+    def get_or_load(self, key, loader):
+        """Read-through lookup: on a miss call loader() and cache its result unless it is None"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        token = self.token(key)
+        value = loader()
+        if value is not None:
+            self.set(key, value, token)
+        return value
+
+class LRUCache(CacheBackend):
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL and an entry count bound.
+    Values are shared between callers, so treat cached rows as read-only.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so a load that raced a write isn't stored
+        self._generation = 0
+        # Per-namespace generations; entries stored under an older one are treated as gone
+        self._namespaces = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for `key`, or `default` if missing, invalidated or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, namespace_generation = entry
+            if namespace_generation != self._namespaces.get(key[0], 0):
+                del self._entries[key]
+                self.misses += 1
+                return default
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, token=None):
+        """
+        Store `value` under `key`, evicting the least recently used entries beyond max_entries.
+        If `token` is given and an invalidation happened since, the value is dropped.
+        """
+        with self._lock:
+            if token is not None and token != self._generation:
+                return False
+            self._entries[key] = (value, time.monotonic() + self.ttl, self._namespaces.get(key[0], 0))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def token(self, key):
+        return self._generation
+
+    def delete(self, *keys):
+        """Invalidate the given keys"""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_namespace(self, namespace: str):
+        """Invalidate every key of `namespace` (entries are dropped lazily on their next lookup)"""
+        with self._lock:
+            self._generation += 1
+            self._namespaces[namespace] = self._namespaces.get(namespace, 0) + 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+# Process-wide repository cache, created on first use when enabled
+_repository_cache = None
+_repository_cache_lock = threading.Lock()
+
+def get_repository_cache():
+    """
+    Return the process-wide repository cache according to REPOSITORY_CACHE:
+    "true" for an in-process LRU, "shared" for an LRU in front of a memory-mapped tier
+    shared with the other workers on this host, anything else for no cache (None).
+    """
+    global _repository_cache
+    mode = os.getenv('REPOSITORY_CACHE', 'false').lower()
+    if mode not in ('true', 'shared'):
+        return None
+    if _repository_cache is None:
+        with _repository_cache_lock:
+            if _repository_cache is None:
+                ttl = float(os.getenv('REPOSITORY_CACHE_TTL', 60))
+                cache = LRUCache(
+                    max_entries=int(os.getenv('REPOSITORY_CACHE_MAX_ENTRIES', 10000)), ttl=ttl
+                )
+                if mode == 'shared':
+                    from helpers.shared_cache import SharedMemoryCache, TieredCache
+                    cache = TieredCache(cache, SharedMemoryCache(
+                        path=os.getenv('REPOSITORY_CACHE_SHARED_PATH'),
+                        slots=int(os.getenv('REPOSITORY_CACHE_SHARED_SLOTS', 4096)),
+                        slot_bytes=int(os.getenv('REPOSITORY_CACHE_SHARED_SLOT_BYTES', 16384)),
+                        ttl=ttl
+                    ))
+                _repository_cache = cache
+    return _repository_cache
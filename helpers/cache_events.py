@@ -0,0 +1,127 @@
+import json
+import os
+import select
+import socket
+import threading
+import logging
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel carrying cache invalidation events between processes and hosts
+CHANNEL = 'facilitator_cache'
+
+# pg_notify payloads must stay under 8000 bytes; bulk writes are split into chunks
+MAX_IDS_PER_EVENT = 500
+
+def cache_events_enabled():
+    """Whether write paths publish invalidation events and a listener consumes them (CACHE_NOTIFY=true)"""
+    return os.getenv('CACHE_NOTIFY', 'false').lower() == 'true'
+
+def event_origin():
+    """Identifies this process so its own events aren't applied twice"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def publish_cache_events(cursor, events: list):
+    """
+    Queue invalidation events on the cursor's transaction; Postgres delivers them to
+    listeners only if it commits. Each event is a dict with at least "entity" and "id".
+    """
+    origin = event_origin()
+    payloads = []
+    for event in events:
+        ids = event.get('id')
+        if isinstance(ids, list):
+            for start in range(0, len(ids), MAX_IDS_PER_EVENT):
+                payloads.append(json.dumps({**event, "id": ids[start:start + MAX_IDS_PER_EVENT], "origin": origin}))
+        else:
+            payloads.append(json.dumps({**event, "origin": origin}))
+    cursor.execute(
+        "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload;",
+        (CHANNEL, payloads)
+    )
+
+class CacheInvalidationListener:
+    """
+    Background thread that LISTENs on CHANNEL over its own connection and passes every
+    event from other processes to `handler(event)`. After a dropped connection events may
+    have been missed, so `on_reconnect()` is called to flush local caches before resuming.
+    """
+
+    def __init__(self, dsn: str, handler, on_reconnect=None, poll_interval: float = 5.0,
+                 retry_interval: float = 5.0):
+        self.dsn = dsn
+        self.handler = handler
+        self.on_reconnect = on_reconnect
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.connected = False
+        self.received = 0
+        self.applied = 0
+        self.errors = 0
+        self.reconnects = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        first_connection = True
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL};")
+                self.connected = True
+                if not first_connection:
+                    self.reconnects += 1
+                    if self.on_reconnect:
+                        self.on_reconnect()
+                first_connection = False
+                logger.info(f"Listening for cache invalidation events on {CHANNEL}")
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except psycopg2.Error as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+            finally:
+                self.connected = False
+                if conn is not None:
+                    conn.close()
+            self._stop.wait(self.retry_interval)
+
+    def _dispatch(self, payload: str):
+        self.received += 1
+        try:
+            event = json.loads(payload)
+            if event.get('origin') == event_origin():
+                return
+            self.handler(event)
+            self.applied += 1
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to apply cache invalidation event {payload!r}: {e}")
+
+    def stats(self):
+        return {
+            "connected": self.connected,
+            "received": self.received,
+            "applied": self.applied,
+            "errors": self.errors,
+            "reconnects": self.reconnects
+        }
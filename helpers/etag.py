@@ -0,0 +1,27 @@
+import hashlib
+
+from flask import request, make_response
+
+# Authenticated payloads may be stored by the browser but must be revalidated on every use
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Strong ETag value (unquoted) for a representation identified by `parts`"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+def client_has(etag: str) -> bool:
+    """True when the request's If-None-Match already names `etag`"""
+    return bool(request.if_none_match) and request.if_none_match.contains(etag)
+
+def not_modified(etag: str):
+    """Empty 304 response for a conditional GET whose ETag still matches"""
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = ETAG_CACHE_CONTROL
+    return response
+
+def with_etag(response, etag: str):
+    """Attach the ETag and revalidation policy to a full response"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = ETAG_CACHE_CONTROL
+    return response
@@ -0,0 +1,34 @@
+import re
+
+# Quoted phrases or bare whitespace-separated terms
+_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+# Characters that can appear in a tsquery lexeme; everything else is a separator
+_WORD = re.compile(r'\w+')
+
+def _phrase(words):
+    return words[0] if len(words) == 1 else '(' + ' <-> '.join(words) + ')'
+
+def build_tsquery(text: str):
+    """
+    Translate user search input into a to_tsquery() expression.
+    All terms must match; "quoted words" must appear as a phrase and a trailing *
+    makes a term a prefix match (yog* -> yog:*). Operators and punctuation typed by
+    the user are treated as separators, so the result is always a valid tsquery.
+    Returns None when the input has no searchable terms.
+    """
+    clauses = []
+    for quoted, term in _TOKEN.findall(text or ''):
+        if quoted:
+            words = _WORD.findall(quoted)
+            if words:
+                clauses.append(_phrase(words))
+            continue
+
+        words = _WORD.findall(term)
+        if not words:
+            continue
+        if term.endswith('*'):
+            words[-1] += ':*'
+        clauses.append(_phrase(words))
+
+    return ' & '.join(clauses) if clauses else None
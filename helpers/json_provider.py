@@ -0,0 +1,79 @@
+import dataclasses
+import datetime
+import json
+import os
+from decimal import Decimal
+from uuid import UUID
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used without it
+    orjson = None
+
+# orjson's own dataclass encoding is slow for slotted records; route them through _default
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+def _default(value):
+    """Encode the column types neither encoder handles on its own"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        # Row records (models.records) carry a to_dict() that is much faster than asdict()
+        to_dict = getattr(value, 'to_dict', None)
+        return to_dict() if to_dict is not None else dataclasses.asdict(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for repository rows: datetimes as ISO 8601 (the same form Postgres'
+    own JSON output uses) and Decimals as numbers. Row records (models.records) are
+    written as objects in column order. Encodes with orjson when it is installed,
+    otherwise with the stdlib encoder.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode()
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None:
+            # Hand orjson's bytes straight to the response instead of round-tripping through str
+            body = orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+        else:
+            body = self.dumps(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def configure_json(app):
+    """Install the JSON provider selected by JSON_PROVIDER ("fast", or Flask's default)"""
+    if os.getenv('JSON_PROVIDER', 'default').lower() == 'fast':
+        app.json = FastJSONProvider(app)
+
+def json_passthrough_enabled():
+    """Whether list endpoints send JSON built by Postgres as-is (JSON_PASSTHROUGH=true)"""
+    return os.getenv('JSON_PASSTHROUGH', 'false').lower() == 'true'
+
+def passthrough_response(raw: dict, **fields):
+    """
+    JSON object response embedding already-serialized JSON text (e.g. a json_agg result)
+    for the keys in `raw` without decoding it; `fields` are encoded by the app's provider.
+    """
+    parts = [f'{json.dumps(key)}:{value}' for key, value in raw.items()]
+    if fields:
+        parts.append(current_app.json.dumps(fields).strip()[1:-1])
+    return current_app.response_class('{' + ','.join(parts) + '}', mimetype='application/json')
@@ -0,0 +1,297 @@
+import hashlib
+import heapq
+import hmac
+import itertools
+import logging
+import os
+import struct
+import threading
+import time
+
+from helpers.shm import MappedFile, default_path, key_hash
+
+logger = logging.getLogger(__name__)
+
+def _digest(secret: bytes, phone_number: str, otp_type: str, otp: str) -> bytes:
+    """Keyed hash stored in place of a code, bound to the phone number and OTP type"""
+    return hashlib.blake2b(f"{otp_type}:{phone_number}:{otp}".encode(), key=secret, digest_size=16).digest()
+
+class OtpStore:
+    """
+    Interface of the OTP stores FacilitatorRepository can use instead of the phone_otps
+    table. Each phone number and OTP type holds one pending code: sending a new code
+    replaces the previous one and resets its attempt counter. A code is single-use and
+    stops matching after `max_attempts` wrong guesses. Stores keep a keyed hash of each
+    code, never the code itself.
+    """
+
+    def create(self, phone_number: str, otp: str, otp_type: str = 'verification', ttl: float = 600):
+        """Store a new code valid for `ttl` seconds; returns an id for it"""
+        raise NotImplementedError
+
+    def claim(self, phone_number: str, otp: str, otp_type: str = 'verification') -> bool:
+        """Consume the pending code if `otp` matches it; a wrong guess counts as an attempt"""
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        """Drop expired codes; returns how many were removed"""
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+class InMemoryOtpStore(OtpStore):
+    """
+    Process-local OTP store: a dict keyed by (phone number, OTP type) for constant-time
+    lookups, plus a heap of expiry times that every call pops from so expired codes are
+    dropped without a scan. Only suitable for a single worker process.
+    """
+
+    def __init__(self, max_attempts: int = 5, max_entries: int = 100000):
+        self.max_attempts = max_attempts
+        self.max_entries = max_entries
+        self._secret = os.urandom(32)
+        # (phone number, otp type) -> [id, otp digest, expires at, attempts]
+        self._codes = {}
+        # (expires at, id, key); entries of replaced or claimed codes are skipped when popped
+        self._expiry = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.claimed = 0
+        self.rejected = 0
+        self.locked_out = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _expire(self, now: float) -> int:
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, code_id, key = heapq.heappop(self._expiry)
+            entry = self._codes.get(key)
+            if entry is not None and entry[0] == code_id:
+                del self._codes[key]
+                removed += 1
+        self.expired += removed
+        return removed
+
+    def create(self, phone_number: str, otp: str, otp_type: str = 'verification', ttl: float = 600):
+        now = time.time()
+        key = (phone_number, otp_type)
+        with self._lock:
+            self._expire(now)
+            if key not in self._codes and len(self._codes) >= self.max_entries:
+                # Full: drop the code closest to expiring
+                while self._expiry:
+                    _, code_id, victim = heapq.heappop(self._expiry)
+                    entry = self._codes.get(victim)
+                    if entry is not None and entry[0] == code_id:
+                        del self._codes[victim]
+                        self.evictions += 1
+                        break
+            code_id = next(self._ids)
+            self._codes[key] = [code_id, _digest(self._secret, phone_number, otp_type, otp), now + ttl, 0]
+            heapq.heappush(self._expiry, (now + ttl, code_id, key))
+            self.created += 1
+            return code_id
+
+    def claim(self, phone_number: str, otp: str, otp_type: str = 'verification') -> bool:
+        key = (phone_number, otp_type)
+        with self._lock:
+            self._expire(time.time())
+            entry = self._codes.get(key)
+            if entry is None:
+                self.rejected += 1
+                return False
+            if entry[3] >= self.max_attempts:
+                self.locked_out += 1
+                return False
+            if hmac.compare_digest(entry[1], _digest(self._secret, phone_number, otp_type, otp)):
+                del self._codes[key]
+                self.claimed += 1
+                return True
+            entry[3] += 1
+            self.rejected += 1
+            return False
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._expire(time.time())
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "pending": len(self._codes),
+            "created": self.created,
+            "claimed": self.claimed,
+            "rejected": self.rejected,
+            "locked_out": self.locked_out,
+            "expired": self.expired,
+            "evictions": self.evictions
+        }
+
+MAGIC = b'FOTPS002'
+# magic, slots, next code id
+HEADER = struct.Struct('<8sIQ')
+HEADER_BYTES = 64
+# key hash, expires at (wall clock), code id, attempts, otp digest, phone number, otp type
+SLOT = struct.Struct('<QdQI16s24s20s')
+SLOT_BYTES = 96
+# Slots probed per key (set-associative placement)
+WAYS = 8
+
+class SharedMemoryOtpStore(OtpStore):
+    """
+    OTP store shared by every worker process on a host, in a memory-mapped file of
+    fixed-size, set-associative slots (a helpers.shm.MappedFile). An expired
+    slot is free for reuse, so expiry needs no background sweep; when all slots of a
+    key's set hold live codes, the one closest to expiring is evicted.
+    Every operation holds an exclusive flock, which makes claim() atomic across workers.
+    Codes are hashed with `secret`, which every worker must share; the default, a random
+    per-process secret, only works for workers forked after the store was created.
+    """
+
+    def __init__(self, path: str = None, slots: int = 65536, max_attempts: int = 5, secret: bytes = None):
+        if slots < WAYS:
+            raise ValueError(f"Invalid OTP store size: slots={slots}")
+        self.path = path or default_path("otps")
+        self.slots = slots - slots % WAYS
+        self.max_attempts = max_attempts
+        self._secret = secret or os.urandom(32)
+        # The header's code id counter changes, so only magic and slots identify the layout
+        self._file = MappedFile(
+            self.path, HEADER_BYTES + self.slots * SLOT_BYTES,
+            HEADER.pack(MAGIC, self.slots, 0)[:12], initial=HEADER.pack(MAGIC, self.slots, 1)
+        )
+        self._locked = self._file.locked
+        self.created = 0
+        self.claimed = 0
+        self.rejected = 0
+        self.locked_out = 0
+        self.evictions = 0
+
+    def _set_offsets(self, hashed: int):
+        first = (hashed % (self.slots // WAYS)) * WAYS
+        return [HEADER_BYTES + slot * SLOT_BYTES for slot in range(first, first + WAYS)]
+
+    def _find(self, hashed: int, phone: bytes, otp_type: bytes, now: float):
+        """(offset, slot) of the key's live code, or (None, None)"""
+        for offset in self._set_offsets(hashed):
+            slot = SLOT.unpack_from(self._file.map, offset)
+            if slot[0] == hashed and slot[1] > now and slot[5].rstrip(b'\0') == phone \
+                    and slot[6].rstrip(b'\0') == otp_type:
+                return offset, slot
+        return None, None
+
+    def create(self, phone_number: str, otp: str, otp_type: str = 'verification', ttl: float = 600):
+        hashed = key_hash((otp_type, phone_number))
+        phone, kind = phone_number.encode(), otp_type.encode()
+        digest = _digest(self._secret, phone_number, otp_type, otp)
+
+        def write():
+            now = time.time()
+            # Reuse the key's slot, else a free or expired one, else evict the soonest to expire
+            victim = victim_expires = None
+            for offset in self._set_offsets(hashed):
+                stored_hash, expires_at = SLOT.unpack_from(self._file.map, offset)[:2]
+                if stored_hash == hashed:
+                    victim, victim_expires = offset, 0.0
+                    break
+                if victim is None or expires_at < victim_expires:
+                    victim, victim_expires = offset, expires_at
+            if victim_expires > now:
+                self.evictions += 1
+            _, _, code_id = HEADER.unpack_from(self._file.map, 0)
+            HEADER.pack_into(self._file.map, 0, MAGIC, self.slots, code_id + 1)
+            SLOT.pack_into(self._file.map, victim, hashed, now + ttl, code_id, 0, digest, phone, kind)
+            return code_id
+
+        code_id = self._locked(write)
+        self.created += 1
+        return code_id
+
+    def claim(self, phone_number: str, otp: str, otp_type: str = 'verification') -> bool:
+        hashed = key_hash((otp_type, phone_number))
+        phone, kind = phone_number.encode(), otp_type.encode()
+        digest = _digest(self._secret, phone_number, otp_type, otp)
+
+        def consume():
+            offset, slot = self._find(hashed, phone, kind, time.time())
+            if offset is None:
+                self.rejected += 1
+                return False
+            if slot[3] >= self.max_attempts:
+                self.locked_out += 1
+                return False
+            if hmac.compare_digest(slot[4], digest):
+                SLOT.pack_into(self._file.map, offset, 0, 0.0, 0, 0, b'', b'', b'')
+                self.claimed += 1
+                return True
+            SLOT.pack_into(self._file.map, offset, *slot[:3], slot[3] + 1, *slot[4:])
+            self.rejected += 1
+            return False
+
+        return self._locked(consume)
+
+    def purge_expired(self) -> int:
+        def sweep():
+            now = time.time()
+            removed = 0
+            for slot in range(self.slots):
+                offset = HEADER_BYTES + slot * SLOT_BYTES
+                stored_hash, expires_at = SLOT.unpack_from(self._file.map, offset)[:2]
+                if stored_hash and expires_at <= now:
+                    SLOT.pack_into(self._file.map, offset, 0, 0.0, 0, 0, b'', b'', b'')
+                    removed += 1
+            return removed
+
+        return self._locked(sweep)
+
+    def stats(self):
+        return {
+            "backend": "shared",
+            "path": self.path,
+            "slots": self.slots,
+            "created": self.created,
+            "claimed": self.claimed,
+            "rejected": self.rejected,
+            "locked_out": self.locked_out,
+            "evictions": self.evictions
+        }
+
+_otp_store = None
+_otp_store_lock = threading.Lock()
+
+def get_otp_store():
+    """
+    Return the process-wide OTP store according to OTP_STORE: "memory" for a store in
+    this process, "shared" for one shared by the workers on this host, anything else
+    ("postgres", the default) for None, meaning the repository uses the phone_otps table.
+    """
+    global _otp_store
+    mode = os.getenv('OTP_STORE', 'postgres').lower()
+    if mode not in ('memory', 'shared'):
+        return None
+    if _otp_store is None:
+        with _otp_store_lock:
+            if _otp_store is None:
+                max_attempts = int(os.getenv('OTP_MAX_ATTEMPTS', 5))
+                if mode == 'shared':
+                    secret = os.getenv('OTP_HASH_SECRET')
+                    if not secret:
+                        logger.warning(
+                            "OTP_HASH_SECRET is not set: shared OTP codes can only be verified by "
+                            "workers forked from this process"
+                        )
+                    _otp_store = SharedMemoryOtpStore(
+                        path=os.getenv('OTP_STORE_SHARED_PATH'),
+                        slots=int(os.getenv('OTP_STORE_SHARED_SLOTS', 65536)),
+                        max_attempts=max_attempts,
+                        secret=hashlib.sha256(secret.encode()).digest() if secret else None
+                    )
+                else:
+                    _otp_store = InMemoryOtpStore(
+                        max_attempts=max_attempts,
+                        max_entries=int(os.getenv('OTP_STORE_MAX_ENTRIES', 100000))
+                    )
+    return _otp_store
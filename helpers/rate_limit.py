@@ -0,0 +1,255 @@
+import math
+import os
+import struct
+import threading
+import time
+
+from helpers.shm import MappedFile, default_path, key_hash
+
+# Rules per endpoint: (scope, algorithm, limit, period seconds). A "bucket" rule allows a
+# burst of `limit` requests and refills at limit/period per second; a "window" rule allows
+# `limit` requests in any sliding `period`. Scopes are the request's phone number and IP.
+RATE_LIMIT_RULES = {
+    'send_otp': [
+        ('phone', 'bucket', 3, 300),
+        ('phone', 'window', 10, 3600),
+        ('ip', 'bucket', 20, 600),
+        ('ip', 'window', 100, 3600),
+    ],
+    'verify_otp': [
+        ('phone', 'bucket', 5, 300),
+        ('ip', 'bucket', 30, 300),
+        ('ip', 'window', 200, 3600),
+    ],
+    # Clients poll delivery status while waiting for the code
+    'sms_status': [
+        ('ip', 'bucket', 60, 60),
+        ('ip', 'window', 600, 3600),
+    ],
+}
+
+def token_bucket(state, now: float, limit: int, period: float):
+    """
+    Take one token from a bucket of `limit` tokens refilled at limit/period per second.
+    `state` is (tokens, updated at) or None for a full bucket.
+    Returns (new state, seconds until a token is available, 0 if one was taken).
+    """
+    rate = limit / period
+    tokens, updated_at = state if state is not None else (limit, now)
+    tokens = min(limit, tokens + (now - updated_at) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / rate
+
+def sliding_window(state, now: float, limit: int, period: float):
+    """
+    Count one request against `limit` per sliding `period`, estimated from the counts of
+    the current and previous fixed windows (the previous one weighted by its overlap).
+    `state` is (window number, current count, previous count) or None.
+    Returns (new state, seconds until a request would be allowed, 0 if it was counted).
+    Rejected requests are not counted.
+    """
+    window = math.floor(now / period)
+    elapsed = now / period - window
+    if state is None:
+        current, previous = 0, 0
+    else:
+        stored_window, current, previous = state
+        if window == stored_window + 1:
+            current, previous = 0, current
+        elif window != stored_window:
+            current, previous = 0, 0
+
+    if previous * (1 - elapsed) + current + 1 <= limit:
+        return (window, current + 1, previous), 0.0
+
+    if current + 1 <= limit:
+        # Wait until enough of the previous window has slid out
+        needed = 1 - (limit - current - 1) / previous
+        return (window, current, previous), (needed - elapsed) * period
+    # Wait for the next window, then until enough of this one has slid out
+    needed = max(0.0, 1 - (limit - 1) / current)
+    return (window, current, previous), (1 - elapsed + needed) * period
+
+ALGORITHMS = {'bucket': token_bucket, 'window': sliding_window}
+
+class RateLimitStore:
+    """Interface of the rate limit state stores: atomic read-modify-write of several keys' states"""
+
+    def update(self, keys: list, apply):
+        """
+        Read the states of `keys` ((key, ttl) pairs), call apply(states) -> (new states, result)
+        and return result, without other updates interleaving. A state is None when absent or
+        idle for its ttl. When new states is None nothing is written.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Rate limit state in this process; expired keys are swept once the dict doubles in size"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._states = {}
+        self._lock = threading.Lock()
+        self._sweep_at = 1024
+
+    def update(self, keys: list, apply):
+        now = time.time()
+        with self._lock:
+            states = []
+            for key, _ in keys:
+                entry = self._states.get(key)
+                states.append(entry[0] if entry is not None and entry[1] > now else None)
+            states, result = apply(states)
+            if states is not None:
+                for (key, ttl), state in zip(keys, states):
+                    self._states[key] = (state, now + ttl)
+                if len(self._states) >= self._sweep_at:
+                    self._sweep(now)
+            return result
+
+    def _sweep(self, now: float):
+        self._states = {key: entry for key, entry in self._states.items() if entry[1] > now}
+        if len(self._states) > self.max_entries:
+            # Still full of live keys: forget the ones closest to expiring
+            keep = sorted(self._states.items(), key=lambda item: item[1][1])[-self.max_entries // 2:]
+            self._states = dict(keep)
+        self._sweep_at = max(1024, 2 * len(self._states))
+
+    def stats(self):
+        return {"backend": "memory", "keys": len(self._states)}
+
+MAGIC = b'FRLIM001'
+# magic, slots
+HEADER = struct.Struct('<8sI')
+HEADER_BYTES = 64
+# key hash, expires at (wall clock), number of state values, up to three state values
+SLOT = struct.Struct('<QdIddd')
+MAX_STATE_VALUES = 3
+# Slots probed per key (set-associative placement)
+WAYS = 8
+
+class SharedMemoryRateLimitStore(RateLimitStore):
+    """
+    Rate limit state shared by every worker process on a host, in a memory-mapped file of
+    set-associative slots (a helpers.shm.MappedFile). Expired slots are reused;
+    when every slot of a key's set is live, the one closest to expiring is evicted.
+    Updates hold an exclusive flock, so limits are enforced across workers.
+    """
+
+    def __init__(self, path: str = None, slots: int = 65536):
+        if slots < WAYS:
+            raise ValueError(f"Invalid rate limit store size: slots={slots}")
+        self.path = path or default_path("ratelimit")
+        self.slots = slots - slots % WAYS
+        self._file = MappedFile(self.path, HEADER_BYTES + self.slots * SLOT.size, HEADER.pack(MAGIC, self.slots))
+        self.evictions = 0
+
+    def _locate(self, hashed: int, now: float, taken: set):
+        """
+        (offset, state) of a key: its own slot, else the free or soonest-expiring slot of
+        its set not in `taken` (the slots already chosen for other keys of the update)
+        """
+        first = (hashed % (self.slots // WAYS)) * WAYS
+        victim = victim_expires = None
+        for slot in range(first, first + WAYS):
+            offset = HEADER_BYTES + slot * SLOT.size
+            stored_hash, expires_at, length, *values = SLOT.unpack_from(self._file.map, offset)
+            if stored_hash == hashed:
+                return offset, tuple(values[:length]) if expires_at > now else None
+            if offset not in taken and (victim is None or expires_at < victim_expires):
+                victim, victim_expires = offset, expires_at
+        if victim_expires > now:
+            self.evictions += 1
+        return victim, None
+
+    def update(self, keys: list, apply):
+        def locked_update():
+            now = time.time()
+            hashes = [key_hash(key) for key, _ in keys]
+            offsets, states = [], []
+            for hashed in hashes:
+                offset, state = self._locate(hashed, now, set(offsets))
+                offsets.append(offset)
+                states.append(state)
+            states, result = apply(states)
+            if states is not None:
+                for hashed, offset, (_, ttl), state in zip(hashes, offsets, keys, states):
+                    padding = (0.0,) * (MAX_STATE_VALUES - len(state))
+                    SLOT.pack_into(self._file.map, offset, hashed, now + ttl, len(state), *state, *padding)
+            return result
+
+        return self._file.locked(locked_update)
+
+    def stats(self):
+        return {"backend": "shared", "path": self.path, "slots": self.slots, "evictions": self.evictions}
+
+class RateLimiter:
+    """Applies RATE_LIMIT_RULES for an endpoint to a request's phone number and IP"""
+
+    def __init__(self, store: RateLimitStore, rules: dict = None):
+        self.store = store
+        self.rules = rules if rules is not None else RATE_LIMIT_RULES
+        self.allowed = {}
+        self.limited = {}
+
+    def check(self, endpoint: str, phone_number: str = None, ip: str = None) -> float:
+        """
+        Count a request to `endpoint`. Returns 0 if it is allowed, otherwise the seconds
+        the client should wait (the longest wait of the rules it exceeded).
+        Every rule is evaluated against the same snapshot and the request is counted only
+        if all of them allow it: a rejected request consumes nothing from any rule.
+        """
+        scopes = {'phone': phone_number, 'ip': ip}
+        rules = [
+            (ALGORITHMS[algorithm], limit, period, (endpoint, scope, algorithm, scopes[scope]))
+            for scope, algorithm, limit, period in self.rules.get(endpoint, [])
+            if scopes.get(scope)
+        ]
+
+        def apply(states):
+            now = time.time()
+            new_states = []
+            retry_after = 0.0
+            for (step, limit, period, _), state in zip(rules, states):
+                state, wait = step(state, now, limit, period)
+                new_states.append(state)
+                retry_after = max(retry_after, wait)
+            return (None if retry_after else new_states), retry_after
+
+        retry_after = self.store.update([(key, 2 * period) for _, _, period, key in rules], apply) if rules else 0.0
+        counters = self.limited if retry_after else self.allowed
+        counters[endpoint] = counters.get(endpoint, 0) + 1
+        return retry_after
+
+    def stats(self):
+        return {"allowed": dict(self.allowed), "limited": dict(self.limited), "store": self.store.stats()}
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Return the process-wide rate limiter according to RATE_LIMIT: "memory" (the default)
+    to keep counters in this process, "shared" to share them between the workers on this
+    host, "off" for no rate limiting (None).
+    """
+    global _rate_limiter
+    mode = os.getenv('RATE_LIMIT', 'memory').lower()
+    if mode not in ('memory', 'shared'):
+        return None
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                if mode == 'shared':
+                    store = SharedMemoryRateLimitStore(
+                        path=os.getenv('RATE_LIMIT_SHARED_PATH'),
+                        slots=int(os.getenv('RATE_LIMIT_SHARED_SLOTS', 65536))
+                    )
+                else:
+                    store = MemoryRateLimitStore(max_entries=int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000)))
+                _rate_limiter = RateLimiter(store)
+    return _rate_limiter
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import logging
+
+from helpers.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+def clean_term(value: str) -> str:
+    """Search term as the query runs it: trimmed, runs of whitespace collapsed to one space"""
+    return ' '.join(value.split()) if value else ''
+
+def normalize_term(value: str) -> str:
+    """
+    Cache key form of a term passed through clean_term: also lowercased, which the
+    case-insensitive (ILIKE, trigram, tsquery) searches ignore
+    """
+    return clean_term(value).lower()
+
+class _Flight:
+    """One in-progress computation that concurrent requests for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class SearchResultCache:
+    """
+    Response cache for the public search endpoints.
+    Entries are fresh for `ttl` seconds, then served stale for up to `stale_ttl` more
+    while one background refresh runs (stale-while-revalidate). Concurrent misses for the
+    same key are coalesced so a single query serves all of them.
+    Entries live in the 'search' namespace of `backend`, so when that is the repository
+    cache, offering and profile writes invalidate them in every worker.
+    """
+
+    def __init__(self, backend, ttl: float = 10, stale_ttl: float = 30, wait_timeout: float = 10):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.wait_timeout = wait_timeout
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+
+    @property
+    def cache_control(self):
+        """Cache-Control header letting browsers and CDNs apply the same freshness rules"""
+        return f"public, max-age={int(self.ttl)}, stale-while-revalidate={int(self.stale_ttl)}"
+
+    def get_or_compute(self, key: tuple, compute):
+        """
+        Return the cached result for `key`, calling compute() on a miss.
+        compute() must not touch the request context: it may run in a background refresh.
+        """
+        key = ('search',) + key
+        entry = self.backend.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._refresh_async(key, compute)
+                return value
+        self.misses += 1
+        return self._load(key, compute)
+
+    def _load(self, key, compute):
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            self.coalesced += 1
+            if flight.done.wait(self.wait_timeout) and flight.error is None:
+                return flight.value
+            # The leading request failed or is too slow; run the query ourselves
+            return compute()
+
+        try:
+            token = self.backend.token(key)
+            value = compute()
+            self.backend.set(key, (time.time(), value), token)
+            flight.value = value
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _refresh_async(self, key, compute):
+        with self._lock:
+            if key in self._inflight:
+                return
+        self.refreshes += 1
+        threading.Thread(target=self._refresh, args=(key, compute), name="search-cache-refresh", daemon=True).start()
+
+    def _refresh(self, key, compute):
+        try:
+            self._load(key, compute)
+        except Exception as e:
+            logger.error(f"Search cache refresh failed: {e}")
+
+    def stats(self):
+        return {
+            "ttl_seconds": self.ttl,
+            "stale_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "in_flight": len(self._inflight)
+        }
+
+def create_search_cache(repository_cache=None):
+    """
+    Build the public search cache, or None when SEARCH_CACHE_TTL is 0.
+    Entries are stored in the repository cache when it is enabled (so writes invalidate
+    them), otherwise in a private LRU where they expire by age only.
+    """
+    ttl = float(os.getenv('SEARCH_CACHE_TTL', 10))
+    if ttl <= 0:
+        return None
+    stale_ttl = float(os.getenv('SEARCH_CACHE_STALE', 30))
+    backend = repository_cache
+    if backend is None:
+        backend = LRUCache(
+            max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 2000)), ttl=ttl + stale_ttl
+        )
+    return SearchResultCache(backend, ttl=ttl, stale_ttl=stale_ttl)
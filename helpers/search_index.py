@@ -0,0 +1,370 @@
+import heapq
+import math
+import os
+import re
+import sys
+import threading
+import time
+import logging
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from helpers.cache_events import cache_events_enabled
+from helpers.stemmer import lexeme
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+')
+
+# Term frequency multipliers per field; details contributes its string values at weight 1
+FIELD_WEIGHTS = (("title", 3), ("category", 2), ("description", 1))
+
+def tokenize(text):
+    """
+    Lexemes of `text` as to_tsvector('english') produces them: lowercased words,
+    stopwords dropped, the rest stemmed, so the index matches what the SQL search matches
+    """
+    if not text:
+        return []
+    return [term for term in map(lexeme, _WORD.findall(text.lower())) if term]
+
+def _details_text(value):
+    """Concatenate the string values nested anywhere in a details JSON document"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return ' '.join(_details_text(v) for v in value.values())
+    if isinstance(value, list):
+        return ' '.join(_details_text(v) for v in value)
+    return ''
+
+def _deep_sizeof(obj, seen=None):
+    """Approximate memory footprint of a row (dict or slotted record) and everything it references"""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_deep_sizeof(v, seen) for v in obj)
+    elif hasattr(type(obj), '__slots__') and not isinstance(obj, type):
+        size += sum(_deep_sizeof(getattr(obj, slot), seen) for slot in type(obj).__slots__)
+    return size
+
+class _IndexData:
+    """
+    Postings storage for one generation of the index.
+    Each term maps to two parallel unsigned-int arrays (doc numbers, term frequencies).
+    Updates append a new doc number and tombstone the old one; compact() rewrites the
+    arrays once tombstones outnumber live documents.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_offering_ids = array('q')
+        self.doc_lengths = array('I')
+        self.live = bytearray()
+        self.docno_by_id = {}
+        self.rows = {}
+        self.live_count = 0
+        self.total_length = 0
+        self._sorted_terms = None
+
+    def add(self, row):
+        terms = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            for term in tokenize(row.get(field)):
+                terms[term] += weight
+        for term in tokenize(_details_text(row.get('details'))):
+            terms[term] += 1
+
+        docno = len(self.doc_lengths)
+        length = sum(terms.values())
+        self.doc_offering_ids.append(row['id'])
+        self.doc_lengths.append(length)
+        self.live.append(1)
+        for term, tf in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array('I'), array('I'))
+                self._sorted_terms = None
+            postings[0].append(docno)
+            postings[1].append(tf)
+
+        self.docno_by_id[row['id']] = docno
+        self.rows[row['id']] = row
+        self.live_count += 1
+        self.total_length += length
+
+    def remove(self, offering_id):
+        docno = self.docno_by_id.pop(offering_id, None)
+        if docno is None:
+            return
+        self.live[docno] = 0
+        self.rows.pop(offering_id, None)
+        self.live_count -= 1
+        self.total_length -= self.doc_lengths[docno]
+        if self.tombstones > max(1024, self.live_count):
+            self.compact()
+
+    @property
+    def tombstones(self):
+        return len(self.doc_lengths) - self.live_count
+
+    def compact(self):
+        """Rebuild the postings from live rows, dropping tombstoned documents"""
+        rows = list(self.rows.values())
+        self.__init__()
+        for row in rows:
+            self.add(row)
+
+    def expand(self, word, prefix):
+        """Vocabulary terms matching a query word (all terms sharing the prefix for word*)"""
+        if not prefix:
+            return [word] if word in self.postings else []
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        terms = []
+        i = bisect_left(self._sorted_terms, word)
+        while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(word):
+            terms.append(self._sorted_terms[i])
+            i += 1
+        return terms
+
+    def memory_bytes(self):
+        postings = sum(
+            sys.getsizeof(term) + sys.getsizeof(docs) + sys.getsizeof(tfs)
+            for term, (docs, tfs) in self.postings.items()
+        ) + sys.getsizeof(self.postings)
+        documents = (
+            sys.getsizeof(self.doc_offering_ids) + sys.getsizeof(self.doc_lengths)
+            + sys.getsizeof(self.live) + sys.getsizeof(self.docno_by_id)
+        )
+        rows = sum(_deep_sizeof(row) for row in self.rows.values()) + sys.getsizeof(self.rows)
+        return {"postings": postings, "documents": documents, "rows": rows,
+                "total": postings + documents + rows}
+
+class OfferingSearchIndex:
+    """
+    In-process BM25 inverted index over active offerings for the public search.
+    Built from one bulk scan, kept current by the repository's offering write paths,
+    and consulted only while fresh; search() returns None whenever the caller should
+    fall back to SQL.
+    """
+
+    def __init__(self, max_age: float = 900, k1: float = 1.2, b: float = 0.75):
+        self.max_age = max_age
+        self.k1 = k1
+        self.b = b
+        self._data = _IndexData()
+        self._lock = threading.RLock()
+        self._row_source = None
+        self._journal = None
+        self._rebuild_thread = None
+        self.ready = False
+        self.stale = False
+        self.built_at = None
+        self.queries = 0
+        self.fallbacks = 0
+
+    # ---------------------------------------------------------------- building
+
+    def start(self, row_source):
+        """Remember where to scan offerings from and build the index in the background"""
+        self._row_source = row_source
+        self.rebuild_async()
+
+    def rebuild(self, rows=None):
+        """Build a new generation from `rows` (default: the row source) and swap it in"""
+        with self._lock:
+            self._journal = []
+        try:
+            data = _IndexData()
+            for row in (rows if rows is not None else self._row_source()):
+                if row.get('is_active', True):
+                    data.add(row)
+        except Exception as e:
+            logger.error(f"Offering search index rebuild failed: {e}")
+            with self._lock:
+                self._journal = None
+                self.stale = True
+            return False
+
+        with self._lock:
+            # Replay writes that landed while the scan was running
+            for action, arg in self._journal:
+                if action == 'upsert':
+                    data.remove(arg['id'])
+                    if arg.get('is_active', True):
+                        data.add(arg)
+                else:
+                    data.remove(arg)
+            self._journal = None
+            self._data = data
+            self.ready = True
+            self.stale = False
+            self.built_at = time.monotonic()
+        logger.info(f"Offering search index built with {data.live_count} offerings")
+        return True
+
+    def rebuild_async(self):
+        """Start a background rebuild unless one is already running"""
+        if self._row_source is None:
+            return
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(
+                target=self.rebuild, name="offering-search-index", daemon=True
+            )
+            self._rebuild_thread.start()
+
+    # ---------------------------------------------------------------- updates
+
+    def upsert(self, row):
+        """Index a written offering; inactive offerings are removed"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(('upsert', row))
+            self._data.remove(row['id'])
+            if row.get('is_active', True):
+                self._data.add(row)
+
+    def remove(self, offering_id):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(('remove', offering_id))
+            self._data.remove(offering_id)
+
+    def mark_stale(self):
+        """Stop serving queries until the next rebuild (e.g. after a write we couldn't index)"""
+        with self._lock:
+            self.stale = True
+
+    def is_fresh(self):
+        return (
+            self.ready and not self.stale
+            and time.monotonic() - self.built_at < self.max_age
+        )
+
+    # ---------------------------------------------------------------- queries
+
+    def search(self, query: str, page: int = 1, limit: int = 10):
+        """
+        BM25-ranked active offerings matching every query word (word* for prefixes).
+        Query words are stemmed and stopwords ignored, as to_tsquery('english') does.
+        Returns None when the index cannot answer: stale, still building, or a query
+        with a phrase ("quoted words", or a term such as self-care that
+        build_tsquery turns into one), which needs positions the index doesn't keep.
+        """
+        if not self.is_fresh():
+            with self._lock:
+                self.fallbacks += 1
+            self.rebuild_async()
+            return None
+        if '"' in query:
+            with self._lock:
+                self.fallbacks += 1
+            return None
+
+        words = []
+        for term in query.split():
+            parts = _WORD.findall(term.lower())
+            if len(parts) > 1:
+                with self._lock:
+                    self.fallbacks += 1
+                return None
+            word = lexeme(parts[0]) if parts else None
+            if word:
+                words.append((word, term.endswith('*')))
+        if not words:
+            return []
+
+        with self._lock:
+            self.queries += 1
+            data = self._data
+            n = data.live_count
+            if n == 0:
+                return []
+            avgdl = data.total_length / n
+            scores = {}
+            matched = Counter()
+
+            for word, prefix in words:
+                seen = set()
+                for term in data.expand(word, prefix):
+                    docs, tfs = data.postings[term]
+                    df = sum(1 for docno in docs if data.live[docno])
+                    if not df:
+                        continue
+                    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                    for docno, tf in zip(docs, tfs):
+                        if not data.live[docno]:
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * data.doc_lengths[docno] / avgdl)
+                        scores[docno] = scores.get(docno, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                        seen.add(docno)
+                for docno in seen:
+                    matched[docno] += 1
+
+            hits = [docno for docno, count in matched.items() if count == len(words)]
+            top = heapq.nlargest(
+                page * limit, hits,
+                key=lambda docno: (scores[docno], data.doc_offering_ids[docno])
+            )[(page - 1) * limit:]
+            results = []
+            for docno in top:
+                row = dict(data.rows[data.doc_offering_ids[docno]])
+                row['search_rank'] = round(scores[docno], 6)
+                results.append(row)
+            return results
+
+    def stats(self):
+        with self._lock:
+            data = self._data
+            return {
+                "ready": self.ready,
+                "fresh": self.is_fresh(),
+                "documents": data.live_count,
+                "terms": len(data.postings),
+                "tombstones": data.tombstones,
+                "queries": self.queries,
+                "fallbacks": self.fallbacks,
+                "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+                "memory_bytes": data.memory_bytes()
+            }
+
+# Process-wide index, created on first use when enabled
+_offering_search_index = None
+_offering_search_index_lock = threading.Lock()
+_disabled_warning = threading.Event()
+
+def get_offering_search_index():
+    """
+    Return the shared index, or None unless enabled. OFFERINGS_SEARCH_INDEX=true needs
+    CACHE_NOTIFY=true, so writes made by other worker processes reach this process's
+    index; OFFERINGS_SEARCH_INDEX=single enables it without events for a single worker.
+    """
+    global _offering_search_index
+    mode = os.getenv('OFFERINGS_SEARCH_INDEX', 'false').lower()
+    if mode not in ('true', 'single'):
+        return None
+    if mode == 'true' and not cache_events_enabled():
+        if not _disabled_warning.is_set():
+            _disabled_warning.set()
+            logger.warning(
+                "OFFERINGS_SEARCH_INDEX=true requires CACHE_NOTIFY=true so other workers' writes "
+                "reach the index; search stays on Postgres (use OFFERINGS_SEARCH_INDEX=single "
+                "for a single worker process)"
+            )
+        return None
+    if _offering_search_index is None:
+        with _offering_search_index_lock:
+            if _offering_search_index is None:
+                _offering_search_index = OfferingSearchIndex(
+                    max_age=float(os.getenv('OFFERINGS_SEARCH_INDEX_MAX_AGE', 900))
+                )
+    return _offering_search_index
@@ -0,0 +1,267 @@
+import json
+import struct
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from helpers.cache import CacheBackend
+from helpers.shm import MappedFile, default_path, key_hash as _key_hash
+from models.records import Record
+
+MAGIC = b'FCACHE02'
+# magic, slots, slot bytes, version buckets
+HEADER = struct.Struct('<8sIII')
+HEADER_BYTES = 64
+# Invalidation counters shared by every process; a key's version is the sum of its
+# bucket's counter and its namespace's counter, so bumping either invalidates it
+VERSION_BUCKETS = 65536
+VERSION = struct.Struct('<Q')
+# key hash, expires at (wall clock), version at store time, payload length
+SLOT_HEADER = struct.Struct('<QdQI')
+SLOT_HEADER_BYTES = 32
+# Slots probed per key (set-associative placement)
+WAYS = 4
+
+# Single-key objects standing for values JSON has no type for; a cached dict that looks
+# like one of them is itself stored as a "$map" of [key, value] pairs
+_TAGS = frozenset(('$tuple', '$datetime', '$date', '$decimal', '$record', '$map'))
+
+def _encode(value):
+    """JSON-compatible form of a cached value (rows, records, lists, keys); TypeError if unsupported"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Record):
+        return {'$record': [type(value).__name__, [_encode(v) for v in value.values()]]}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and not (len(value) == 1 and next(iter(value)) in _TAGS):
+            return {k: _encode(v) for k, v in value.items()}
+        return {'$map': [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, tuple):
+        return {'$tuple': [_encode(v) for v in value]}
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'$decimal': str(value)}
+    raise TypeError(f"Cannot store {type(value).__name__} in the shared cache")
+
+_RECORD_TYPES = {}
+
+def _decode_object(obj):
+    if len(obj) != 1:
+        return obj
+    tag, value = next(iter(obj.items()))
+    if tag == '$tuple':
+        return tuple(value)
+    if tag == '$datetime':
+        return datetime.fromisoformat(value)
+    if tag == '$date':
+        return date.fromisoformat(value)
+    if tag == '$decimal':
+        return Decimal(value)
+    if tag == '$record':
+        if not _RECORD_TYPES:
+            _RECORD_TYPES.update((cls.__name__, cls) for cls in Record.__subclasses__())
+        return _RECORD_TYPES[value[0]](*value[1])
+    if tag == '$map':
+        return {k: v for k, v in value}
+    return obj
+
+def dumps(value) -> bytes:
+    return json.dumps(_encode(value), separators=(',', ':')).encode()
+
+def loads(payload: bytes):
+    """Decode a payload written by dumps(); only data is ever constructed (never code, unlike pickle)"""
+    return json.loads(payload, object_hook=_decode_object)
+
+class SharedMemoryCache(CacheBackend):
+    """
+    Cache tier shared by every worker process on a host, stored in a memory-mapped file.
+    The file holds a table of invalidation counters followed by fixed-size, set-associative
+    value slots; values that don't fit a slot are not stored here, but their keys are still
+    invalidated through the counters. Writers take an exclusive flock on the file.
+    Values are stored as tagged JSON (see dumps()), so a tampered file can't run code.
+    """
+
+    def __init__(self, path: str = None, slots: int = 4096, slot_bytes: int = 16384, ttl: float = 60):
+        if slots < WAYS or slot_bytes <= SLOT_HEADER_BYTES:
+            raise ValueError(f"Invalid shared cache geometry: slots={slots}, slot_bytes={slot_bytes}")
+        self.path = path or default_path("cache")
+        self.slots = slots - slots % WAYS
+        self.slot_bytes = slot_bytes
+        self.ttl = ttl
+        self._versions_offset = HEADER_BYTES
+        self._slots_offset = HEADER_BYTES + VERSION_BUCKETS * VERSION.size
+        self._file = MappedFile(
+            self.path, self._slots_offset + self.slots * self.slot_bytes,
+            HEADER.pack(MAGIC, self.slots, self.slot_bytes, VERSION_BUCKETS)
+        )
+        self._locked = self._file.locked
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.oversize = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ---------------------------------------------------------------- storage
+
+    def _counter_offset(self, key):
+        return self._versions_offset + (_key_hash(key) % VERSION_BUCKETS) * VERSION.size
+
+    def _bump(self, key):
+        offset = self._counter_offset(key)
+        VERSION.pack_into(self._file.map, offset, VERSION.unpack_from(self._file.map, offset)[0] + 1)
+
+    # ---------------------------------------------------------------- interface
+
+    def token(self, key):
+        """Current version of `key`; lock-free since counters only ever increase"""
+        return (
+            VERSION.unpack_from(self._file.map, self._counter_offset(key))[0]
+            + VERSION.unpack_from(self._file.map, self._counter_offset(('namespace', key[0])))[0]
+        )
+
+    def get(self, key, default=None):
+        key_hash = _key_hash(key)
+        version = self.token(key)
+        first = (key_hash % (self.slots // WAYS)) * WAYS
+
+        def read():
+            for slot in range(first, first + WAYS):
+                offset = self._slots_offset + slot * self.slot_bytes
+                stored_hash, expires_at, stored_version, length = SLOT_HEADER.unpack_from(self._file.map, offset)
+                if length and stored_hash == key_hash:
+                    if stored_version != version or expires_at <= time.time():
+                        return None
+                    start = offset + SLOT_HEADER_BYTES
+                    return self._file.map[start:start + length]
+            return None
+
+        payload = self._locked(read)
+        if payload is not None:
+            stored_key, value = loads(payload)
+            if stored_key == key:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def set(self, key, value, token=None):
+        try:
+            payload = dumps((key, value))
+        except TypeError:
+            payload = None
+        if payload is None or len(payload) > self.slot_bytes - SLOT_HEADER_BYTES:
+            self.oversize += 1
+            return False
+        key_hash = _key_hash(key)
+        first = (key_hash % (self.slots // WAYS)) * WAYS
+
+        def write():
+            version = self.token(key)
+            if token is not None and token != version:
+                return False
+            # Reuse the key's slot, else a free or expired one, else evict the soonest to expire
+            now = time.time()
+            victim = None
+            evicting = False
+            for slot in range(first, first + WAYS):
+                offset = self._slots_offset + slot * self.slot_bytes
+                stored_hash, expires_at, _, length = SLOT_HEADER.unpack_from(self._file.map, offset)
+                if length and stored_hash == key_hash:
+                    victim, evicting = offset, False
+                    break
+                if not length or expires_at <= now:
+                    if victim is None or evicting:
+                        victim, evicting = offset, False
+                elif victim is None or (evicting and expires_at < victim_expires):
+                    victim, victim_expires, evicting = offset, expires_at, True
+            if evicting:
+                self.evictions += 1
+            self._file.map[victim + SLOT_HEADER_BYTES:victim + SLOT_HEADER_BYTES + len(payload)] = payload
+            SLOT_HEADER.pack_into(self._file.map, victim, key_hash, now + self.ttl, version, len(payload))
+            self.stores += 1
+            return True
+
+        return self._locked(write)
+
+    def delete(self, *keys):
+        def bump():
+            for key in keys:
+                self._bump(key)
+        self._locked(bump)
+        self.invalidations += len(keys)
+
+    def invalidate_namespace(self, namespace: str):
+        self._locked(lambda: self._bump(('namespace', namespace)))
+        self.invalidations += 1
+
+    def clear(self):
+        def wipe():
+            for slot in range(self.slots):
+                SLOT_HEADER.pack_into(self._file.map, self._slots_offset + slot * self.slot_bytes, 0, 0.0, 0, 0)
+        self._locked(wipe)
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "slots": self.slots,
+            "slot_bytes": self.slot_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "oversize": self.oversize,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+class TieredCache(CacheBackend):
+    """
+    In-process L1 in front of a host-wide SharedMemoryCache L2.
+    L1 entries remember the L2 version of their key and are only served while it is
+    unchanged, so an invalidation in any worker evicts the key from every worker's L1.
+    """
+
+    def __init__(self, local, shared: SharedMemoryCache):
+        self.local = local
+        self.shared = shared
+
+    def token(self, key):
+        return self.shared.token(key)
+
+    def get(self, key, default=None):
+        version = self.shared.token(key)
+        entry = self.local.get(key)
+        if entry is not None and entry[1] == version:
+            return entry[0]
+        value = self.shared.get(key)
+        if value is None:
+            return default
+        self.local.set(key, (value, version))
+        return value
+
+    def set(self, key, value, token=None):
+        version = self.shared.token(key) if token is None else token
+        self.shared.set(key, value, version)
+        # A stale version is harmless here: get() won't serve the entry
+        self.local.set(key, (value, version))
+        return True
+
+    def delete(self, *keys):
+        self.shared.delete(*keys)
+        self.local.delete(*keys)
+
+    def invalidate_namespace(self, namespace: str):
+        self.shared.invalidate_namespace(namespace)
+        self.local.invalidate_namespace(namespace)
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+
+    def stats(self):
+        return {"local": self.local.stats(), "shared": self.shared.stats()}
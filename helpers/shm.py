@@ -0,0 +1,103 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import stat
+import tempfile
+import threading
+
+def key_hash(key) -> int:
+    """Non-zero 64-bit hash of a key that is stable across processes (unlike hash())"""
+    return int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=8).digest(), 'little') or 1
+
+def _check_private(st, path: str, kind: str):
+    """Refuse files or directories another user could have planted or can read"""
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"Refusing shared memory {kind} {path}: must be owned by uid {os.getuid()} "
+            f"and not accessible to group or others (mode {stat.S_IMODE(st.st_mode):o})"
+        )
+
+def default_path(name: str) -> str:
+    """
+    Path of the shared file `name` in this user's private directory
+    (/dev/shm/facilitator-<uid>, mode 0700, created on first use)
+    """
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    directory = os.path.join(base, f"facilitator-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"Refusing shared memory directory {directory}: not a directory")
+    _check_private(st, directory, "directory")
+    return os.path.join(directory, name)
+
+class MappedFile:
+    """
+    A fixed-size file memory-mapped by every worker process on a host, guarded by an
+    exclusive flock for cross-process updates.
+    The file is opened without following symlinks and must belong to this user with no
+    group/other permissions. It is (re)initialized with `initial` when its size differs
+    or it doesn't start with `header`. flock is per open file, so a worker forked after
+    the file was opened reopens it before its first locked operation.
+    """
+
+    def __init__(self, path: str, size: int, header: bytes, initial: bytes = None):
+        self.path = path
+        self.size = size
+        self.header = header
+        self.initial = initial if initial is not None else header
+        self.map = None
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        if self.map is not None:
+            # Inherited from the parent process; replace with this process's own handle
+            self.map.close()
+            self._file.close()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600)
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                raise PermissionError(f"Refusing shared memory file {self.path}: not a regular file")
+            _check_private(st, self.path, "file")
+            if st.st_nlink != 1:
+                # A hard link to another of this user's files; don't truncate it
+                raise PermissionError(f"Refusing shared memory file {self.path}: it has other links")
+        except BaseException:
+            os.close(fd)
+            raise
+        self._file = os.fdopen(fd, 'r+b', buffering=0)
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            self._file.seek(0, os.SEEK_END)
+            current = None
+            if self._file.tell() == self.size:
+                self._file.seek(0)
+                current = self._file.read(len(self.header))
+            if current != self.header:
+                self._file.truncate(0)
+                self._file.truncate(self.size)
+                self._file.seek(0)
+                self._file.write(self.initial)
+            self.map = mmap.mmap(self._file.fileno(), self.size)
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._pid = os.getpid()
+
+    def locked(self, operation):
+        """Run operation() holding this process's thread lock and the cross-process flock"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                return operation()
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
@@ -0,0 +1,456 @@
+import heapq
+import os
+import queue
+import random
+import struct
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict, deque
+
+from helpers.firebase_sms import firebase_sms_service
+from helpers.shm import MappedFile, default_path, key_hash
+
+logger = logging.getLogger(__name__)
+
+# Delivery states of a queued message
+SMS_QUEUED = "queued"
+SMS_SENDING = "sending"
+SMS_RETRYING = "retrying"  # a send failed; waiting for the next attempt
+SMS_DELIVERED = "delivered"
+SMS_DEAD = "dead"  # every attempt failed; kept in the dead-letter list
+SMS_STATES = (SMS_QUEUED, SMS_SENDING, SMS_RETRYING, SMS_DELIVERED, SMS_DEAD)
+
+class FirebaseSMSProvider:
+    """Sends OTP messages through helpers.firebase_sms"""
+
+    name = "firebase"
+
+    def send(self, phone_number: str, otp: str) -> bool:
+        return firebase_sms_service.send_otp_sms(phone_number, otp)
+
+class StubSMSProvider:
+    """
+    Local stand-in for the SMS provider: nothing is sent, each call sleeps for a random
+    latency around `latency` seconds and fails with probability `failure_rate`.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.5, failure_rate: float = 0.2, seed: int = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+
+    def send(self, phone_number: str, otp: str) -> bool:
+        with self._lock:
+            delay = self._random.uniform(0.5, 1.5) * self.latency
+            fail = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        with self._lock:
+            if fail:
+                self.failed += 1
+            else:
+                self.sent += 1
+        if fail:
+            raise RuntimeError("stub provider: simulated delivery failure")
+        print(f"📱 Stub SMS to {phone_number}: use OTP {otp}")
+        return True
+
+def get_sms_provider():
+    """SMS provider selected by SMS_PROVIDER: "firebase" (the default) or "stub" for local runs"""
+    if os.getenv('SMS_PROVIDER', 'firebase').lower() == 'stub':
+        return StubSMSProvider(
+            latency=float(os.getenv('SMS_STUB_LATENCY', 0.5)),
+            failure_rate=float(os.getenv('SMS_STUB_FAILURE_RATE', 0.2))
+        )
+    return FirebaseSMSProvider()
+
+class SmsMessage:
+    """One outbound OTP message and its delivery state"""
+
+    def __init__(self, phone_number: str, otp: str):
+        self.id = uuid.uuid4().hex
+        self.phone_number = phone_number
+        self.otp = otp
+        self.status = SMS_QUEUED
+        self.attempts = 0
+        self.last_error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.next_attempt_at = None
+
+    def to_dict(self):
+        """Delivery status for API clients (the code itself is never included)"""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "next_attempt_at": self.next_attempt_at
+        }
+
+class SmsStatusStore:
+    """Interface of the delivery status stores: the latest status of each message for `ttl` seconds"""
+
+    def put(self, status: dict):
+        """Record a message's status (SmsMessage.to_dict()); it is kept `ttl` seconds from now"""
+        raise NotImplementedError
+
+    def get(self, message_id: str):
+        """Latest status of a message, or None if unknown or expired"""
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+class MemorySmsStatusStore(SmsStatusStore):
+    """
+    Statuses in this process, ordered by last update so expired ones are dropped from the
+    front. Only answers for messages sent by this process: use the shared store with
+    several workers.
+    """
+
+    def __init__(self, ttl: float = 900, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        # message id -> (status, expires at)
+        self._statuses = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def put(self, status: dict):
+        if self._pid != os.getpid():
+            self._reset()
+        now = time.time()
+        with self._lock:
+            self._statuses.pop(status["id"], None)
+            self._statuses[status["id"]] = (status, now + self.ttl)
+            while self._statuses:
+                _, (_, expires_at) = next(iter(self._statuses.items()))
+                if expires_at > now and len(self._statuses) <= self.max_entries:
+                    break
+                self._statuses.popitem(last=False)
+
+    def get(self, message_id: str):
+        if self._pid != os.getpid():
+            self._reset()
+        with self._lock:
+            entry = self._statuses.get(message_id)
+            return dict(entry[0]) if entry is not None and entry[1] > time.time() else None
+
+    def stats(self):
+        return {"backend": "memory", "messages": len(self._statuses)}
+
+MAGIC = b'FSMSS001'
+# magic, slots
+HEADER = struct.Struct('<8sI')
+HEADER_BYTES = 64
+# key hash, expires at (wall clock), state, attempts, created at, updated at,
+# next attempt at (0 for none), message id, last error (truncated)
+SLOT = struct.Struct('<QdBHddd32s96s')
+SLOT_BYTES = 192
+# Slots probed per key (set-associative placement)
+WAYS = 8
+
+class SharedMemorySmsStatusStore(SmsStatusStore):
+    """
+    Statuses shared by every worker process on a host, so a status request can land on any
+    worker. A memory-mapped file of set-associative slots (a helpers.shm.MappedFile):
+    expired slots are reused, and when every slot of a message's set is live the one
+    closest to expiring is evicted. Error messages are truncated to 96 bytes.
+    """
+
+    def __init__(self, path: str = None, slots: int = 16384, ttl: float = 900):
+        if slots < WAYS:
+            raise ValueError(f"Invalid SMS status store size: slots={slots}")
+        self.path = path or default_path("sms-status")
+        self.slots = slots - slots % WAYS
+        self.ttl = ttl
+        self._file = MappedFile(self.path, HEADER_BYTES + self.slots * SLOT_BYTES, HEADER.pack(MAGIC, self.slots))
+        self.evictions = 0
+
+    def _set_offsets(self, hashed: int):
+        first = (hashed % (self.slots // WAYS)) * WAYS
+        return [HEADER_BYTES + slot * SLOT_BYTES for slot in range(first, first + WAYS)]
+
+    def put(self, status: dict):
+        hashed = key_hash(status["id"])
+        message_id = status["id"].encode()
+        error = (status["last_error"] or '').encode()[:96]
+
+        def write():
+            now = time.time()
+            victim = victim_expires = None
+            for offset in self._set_offsets(hashed):
+                slot = SLOT.unpack_from(self._file.map, offset)
+                if slot[0] == hashed and slot[7].rstrip(b'\0') == message_id:
+                    victim, victim_expires = offset, 0.0
+                    break
+                if victim is None or slot[1] < victim_expires:
+                    victim, victim_expires = offset, slot[1]
+            if victim_expires > now:
+                self.evictions += 1
+            SLOT.pack_into(
+                self._file.map, victim, hashed, now + self.ttl, SMS_STATES.index(status["status"]),
+                status["attempts"], status["created_at"], status["updated_at"],
+                status["next_attempt_at"] or 0.0, message_id, error
+            )
+
+        self._file.locked(write)
+
+    def get(self, message_id: str):
+        hashed = key_hash(message_id)
+        encoded = message_id.encode()
+
+        def read():
+            now = time.time()
+            for offset in self._set_offsets(hashed):
+                slot = SLOT.unpack_from(self._file.map, offset)
+                if slot[0] == hashed and slot[1] > now and slot[7].rstrip(b'\0') == encoded:
+                    return slot
+            return None
+
+        slot = self._file.locked(read)
+        if slot is None:
+            return None
+        _, _, state, attempts, created_at, updated_at, next_attempt_at, _, error = slot
+        return {
+            "id": message_id,
+            "status": SMS_STATES[state],
+            "attempts": attempts,
+            "last_error": error.rstrip(b'\0').decode(errors='ignore') or None,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "next_attempt_at": next_attempt_at or None
+        }
+
+    def stats(self):
+        return {"backend": "shared", "path": self.path, "slots": self.slots, "evictions": self.evictions}
+
+class SmsQueue:
+    """
+    Outbound SMS queue drained by a fixed pool of sender threads, so requests return
+    as soon as a message is enqueued. A failed send is retried after an exponentially
+    growing, jittered delay (backoff * 2^(attempt - 1), capped at max_backoff) up to
+    max_attempts. Messages that exhaust their attempts, or find the queue full when their
+    retry is due, go to a bounded dead-letter list.
+    Every status change is written to `status_store` (a SmsStatusStore), which answers
+    status lookups.
+    """
+
+    def __init__(self, provider, workers: int = 4, max_size: int = 1000, max_attempts: int = 4,
+                 backoff: float = 1.0, max_backoff: float = 30.0, status_store: SmsStatusStore = None,
+                 dead_letter_size: int = 1000):
+        self.provider = provider
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.status_store = status_store if status_store is not None else MemorySmsStatusStore()
+        self.max_size = max_size
+        self._reset()
+        self.dead_letters = deque(maxlen=dead_letter_size)
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self.enqueued = 0
+        self.rejected = 0
+        self.delivered = 0
+        self.retries = 0
+        self.dead = 0
+        self.in_flight = 0
+
+    def _reset(self):
+        self._ready = queue.Queue(maxsize=self.max_size)
+        # (due at, sequence, message) of messages waiting for a retry
+        self._delayed = []
+        self._sequence = 0
+        self._delayed_changed = threading.Condition()
+        self._counters_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._threads and self._pid == os.getpid():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked from a process with a running queue (e.g. a preloaded app): its threads
+                # and pending messages stay with the parent, this worker starts empty
+                self._reset()
+            self._threads = []
+            self._stop.clear()
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._send_loop, name=f"sms-sender-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._retry_loop, name="sms-retry-scheduler", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            # Set last: enqueue() only skips start() once the pool is running
+            self._pid = os.getpid()
+
+    def stop(self):
+        self._stop.set()
+        with self._delayed_changed:
+            self._delayed_changed.notify_all()
+
+    def enqueue(self, phone_number: str, otp: str):
+        """Queue an OTP message; returns its id, or None when the queue is full"""
+        if self._pid != os.getpid():
+            self.start()
+        message = SmsMessage(phone_number, otp)
+        # Recorded before a sender can pick the message up, so its later updates win
+        self.status_store.put(message.to_dict())
+        try:
+            self._ready.put_nowait(message)
+        except queue.Full:
+            self.rejected += 1
+            return None
+        self.enqueued += 1
+        return message.id
+
+    def status(self, message_id: str):
+        """Delivery status of a message, or None if unknown or expired"""
+        return self.status_store.get(message_id)
+
+    def _send_loop(self):
+        while not self._stop.is_set():
+            try:
+                message = self._ready.get(timeout=1)
+            except queue.Empty:
+                continue
+            self._attempt(message)
+
+    def _attempt(self, message: SmsMessage):
+        message.status = SMS_SENDING
+        message.attempts += 1
+        message.updated_at = time.time()
+        self.status_store.put(message.to_dict())
+        with self._counters_lock:
+            self.in_flight += 1
+        try:
+            delivered = self.provider.send(message.phone_number, message.otp)
+            error = None if delivered else "provider reported failure"
+        except Exception as e:
+            delivered = False
+            error = str(e)
+        finally:
+            with self._counters_lock:
+                self.in_flight -= 1
+
+        message.updated_at = time.time()
+        if delivered:
+            message.status = SMS_DELIVERED
+            message.last_error = None
+            message.next_attempt_at = None
+            self.delivered += 1
+            self.status_store.put(message.to_dict())
+            return
+
+        message.last_error = error
+        if message.attempts >= self.max_attempts:
+            self._dead_letter(message, f"failed after {message.attempts} attempts: {error}")
+            return
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (message.attempts - 1))
+        delay *= random.uniform(0.5, 1.0)
+        message.status = SMS_RETRYING
+        message.next_attempt_at = message.updated_at + delay
+        self.retries += 1
+        self.status_store.put(message.to_dict())
+        with self._delayed_changed:
+            self._sequence += 1
+            heapq.heappush(self._delayed, (message.next_attempt_at, self._sequence, message))
+            self._delayed_changed.notify()
+
+    def _retry_loop(self):
+        """Move messages whose backoff has elapsed back onto the ready queue"""
+        while not self._stop.is_set():
+            with self._delayed_changed:
+                now = time.time()
+                due = []
+                while self._delayed and self._delayed[0][0] <= now:
+                    due.append(heapq.heappop(self._delayed)[2])
+                if not due:
+                    timeout = self._delayed[0][0] - now if self._delayed else None
+                    self._delayed_changed.wait(timeout)
+                    continue
+            for message in due:
+                try:
+                    self._ready.put_nowait(message)
+                except queue.Full:
+                    # Blocking here would stall every other retry (and stop() with them)
+                    message.last_error = "queue full when retrying"
+                    message.updated_at = time.time()
+                    self._dead_letter(message, message.last_error)
+
+    def _dead_letter(self, message: SmsMessage, reason: str):
+        message.status = SMS_DEAD
+        message.next_attempt_at = None
+        with self._counters_lock:
+            self.dead += 1
+        self.status_store.put(message.to_dict())
+        self.dead_letters.append(message.to_dict() | {"phone_number": message.phone_number})
+        logger.error(f"SMS {message.id} to {message.phone_number} {reason}")
+
+    def stats(self):
+        return {
+            "provider": getattr(self.provider, 'name', type(self.provider).__name__),
+            "workers": self.workers,
+            "queued": self._ready.qsize(),
+            "waiting_retry": len(self._delayed),
+            "in_flight": self.in_flight,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "dead": self.dead,
+            "status_store": self.status_store.stats()
+        }
+
+_sms_queue = None
+_sms_queue_lock = threading.Lock()
+
+def get_sms_queue():
+    """
+    Return the process-wide SMS queue, started on first use, when SMS_QUEUE=true;
+    otherwise None and OTP messages are sent synchronously within the request.
+    SMS_STATUS_STORE selects where delivery status is kept: "memory" (the default) in this
+    process, "shared" for the workers on this host.
+    """
+    global _sms_queue
+    if os.getenv('SMS_QUEUE', 'false').lower() != 'true':
+        return None
+    if _sms_queue is None:
+        with _sms_queue_lock:
+            if _sms_queue is None:
+                if os.getenv('SMS_STATUS_STORE', 'memory').lower() == 'shared':
+                    status_store = SharedMemorySmsStatusStore(
+                        path=os.getenv('SMS_STATUS_SHARED_PATH'),
+                        slots=int(os.getenv('SMS_STATUS_SHARED_SLOTS', 16384))
+                    )
+                else:
+                    status_store = MemorySmsStatusStore()
+                sms_queue = SmsQueue(
+                    get_sms_provider(),
+                    status_store=status_store,
+                    workers=int(os.getenv('SMS_QUEUE_WORKERS', 4)),
+                    max_size=int(os.getenv('SMS_QUEUE_MAX_SIZE', 1000)),
+                    max_attempts=int(os.getenv('SMS_MAX_ATTEMPTS', 4)),
+                    backoff=float(os.getenv('SMS_RETRY_BACKOFF', 1.0)),
+                    max_backoff=float(os.getenv('SMS_RETRY_MAX_BACKOFF', 30.0))
+                )
+                sms_queue.start()
+                _sms_queue = sms_queue
+    return _sms_queue
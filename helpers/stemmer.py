@@ -0,0 +1,169 @@
+from functools import lru_cache
+
+# PostgreSQL's english.stop, dropped by the 'english' text search configuration
+STOPWORDS = frozenset("""
+i me my myself we our ours ourselves you your yours yourself yourselves he him his himself
+she her hers herself it its itself they them their theirs themselves what which who whom
+this that these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about against
+between into through during before after above below to from up down in out on off over
+under again further then once here there when where why how all any both each few more
+most other some such no nor not only own same so than too very s t can will just don
+should now
+""".split())
+
+_VOWELS = frozenset('aeiouy')
+_DOUBLES = ('bb', 'dd', 'ff', 'gg', 'mm', 'nn', 'pp', 'rr', 'tt')
+_LI_ENDINGS = frozenset('cdeghkmnrt')
+
+_EXCEPTIONS = {
+    'skis': 'ski', 'skies': 'sky', 'dying': 'die', 'lying': 'lie', 'tying': 'tie',
+    'idly': 'idl', 'gently': 'gentl', 'ugly': 'ugli', 'early': 'earli', 'only': 'onli',
+    'singly': 'singl', 'sky': 'sky', 'news': 'news', 'howe': 'howe', 'atlas': 'atlas',
+    'cosmos': 'cosmos', 'bias': 'bias', 'andes': 'andes',
+}
+_INVARIANT_AFTER_1A = frozenset(
+    ('inning', 'outing', 'canning', 'herring', 'earring', 'proceed', 'exceed', 'succeed')
+)
+
+_STEP2 = (
+    ('ization', 'ize'), ('ational', 'ate'), ('fulness', 'ful'), ('ousness', 'ous'),
+    ('iveness', 'ive'), ('tional', 'tion'), ('biliti', 'ble'), ('lessli', 'less'),
+    ('entli', 'ent'), ('ation', 'ate'), ('alism', 'al'), ('aliti', 'al'), ('ousli', 'ous'),
+    ('iviti', 'ive'), ('fulli', 'ful'), ('enci', 'ence'), ('anci', 'ance'), ('abli', 'able'),
+    ('izer', 'ize'), ('ator', 'ate'), ('alli', 'al'), ('bli', 'ble'), ('ogi', 'og'), ('li', ''),
+)
+_STEP3 = (
+    ('ational', 'ate'), ('tional', 'tion'), ('alize', 'al'), ('icate', 'ic'), ('iciti', 'ic'),
+    ('ative', ''), ('ical', 'ic'), ('ness', ''), ('ful', ''),
+)
+_STEP4 = (
+    'ement', 'ance', 'ence', 'able', 'ible', 'ment', 'ant', 'ent', 'ism', 'ate', 'iti',
+    'ous', 'ive', 'ize', 'ion', 'al', 'er', 'ic',
+)
+
+def _regions(word):
+    """Start offsets of R1 and R2 (Snowball definitions, with the gener/commun/arsen exceptions)"""
+    def after_vowel_consonant(start):
+        for i in range(start + 1, len(word)):
+            if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+                return i + 1
+        return len(word)
+
+    for prefix in ('gener', 'commun', 'arsen'):
+        if word.startswith(prefix):
+            r1 = len(prefix)
+            break
+    else:
+        r1 = after_vowel_consonant(0)
+    return r1, after_vowel_consonant(r1)
+
+def _ends_short_syllable(word):
+    if len(word) == 2:
+        return word[0] in _VOWELS and word[1] not in _VOWELS
+    return (
+        len(word) > 2 and word[-3] not in _VOWELS and word[-2] in _VOWELS
+        and word[-1] not in _VOWELS and word[-1] not in 'wxY'
+    )
+
+def _has_vowel(text):
+    return any(c in _VOWELS for c in text)
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Snowball English (Porter2) stem of a lowercase word, as PostgreSQL's english_stem computes it"""
+    if len(word) <= 2:
+        return word
+    if word in _EXCEPTIONS:
+        return _EXCEPTIONS[word]
+
+    if word[0] == 'y':
+        word = 'Y' + word[1:]
+    word = word[0] + ''.join(
+        'Y' if c == 'y' and word[i] in _VOWELS else c for i, c in enumerate(word[1:])
+    )
+    r1, r2 = _regions(word)
+
+    # Step 1a
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith(('ied', 'ies')):
+        word = word[:-2] if len(word) > 4 else word[:-1]
+    elif word.endswith(('us', 'ss')):
+        pass
+    elif word.endswith('s') and _has_vowel(word[:-2]):
+        word = word[:-1]
+
+    if word in _INVARIANT_AFTER_1A:
+        return word
+
+    # Step 1b
+    for suffix in ('eedly', 'ingly', 'edly', 'eed', 'ing', 'ed'):
+        if word.endswith(suffix):
+            if suffix in ('eed', 'eedly'):
+                if len(word) - len(suffix) >= r1:
+                    word = word[:-len(suffix)] + 'ee'
+            elif _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(('at', 'bl', 'iz')):
+                    word += 'e'
+                elif word.endswith(_DOUBLES):
+                    word = word[:-1]
+                elif r1 >= len(word) and _ends_short_syllable(word):
+                    word += 'e'
+            break
+
+    # Step 1c
+    if len(word) > 2 and word[-1] in 'yY' and word[-2] not in _VOWELS:
+        word = word[:-1] + 'i'
+
+    # Step 2
+    for suffix, replacement in _STEP2:
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= r1:
+                if suffix == 'ogi':
+                    if word[-4:-3] == 'l':
+                        word = word[:-1]
+                elif suffix == 'li':
+                    if word[-3:-2] in _LI_ENDINGS and len(word) > 2:
+                        word = word[:-2]
+                else:
+                    word = word[:-len(suffix)] + replacement
+            break
+
+    # Step 3
+    for suffix, replacement in _STEP3:
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= r1:
+                if suffix == 'ative':
+                    if len(word) - len(suffix) >= r2:
+                        word = word[:-5]
+                else:
+                    word = word[:-len(suffix)] + replacement
+            break
+
+    # Step 4
+    for suffix in _STEP4:
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= r2:
+                if suffix != 'ion' or word[-4:-3] in ('s', 't'):
+                    word = word[:-len(suffix)]
+            break
+
+    # Step 5
+    if word.endswith('e'):
+        if len(word) - 1 >= r2 or (len(word) - 1 >= r1 and not _ends_short_syllable(word[:-1])):
+            word = word[:-1]
+    elif word.endswith('l') and len(word) - 1 >= r2 and word[-2:-1] == 'l':
+        word = word[:-1]
+
+    return word.replace('Y', 'y')
+
+def lexeme(word: str):
+    """Lexeme PostgreSQL's 'english' configuration indexes for a lowercase word, or None for a stopword"""
+    if not word.isalpha():
+        # Numbers and words with digits go through the 'simple' dictionary: kept as is
+        return word
+    if word in STOPWORDS:
+        return None
+    return stem(word)
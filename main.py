@@ -8,11 +8,24 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from routes.phone_auth_routes import auth_bp
-from routes.facilitator_routes import facilitator_bp
+from routes.facilitator_routes import facilitator_bp, search_cache
 from routes.offerings_routes import offerings_bp
+from models.database import FacilitatorRepository, get_db_manager
+from helpers.search_index import get_offering_search_index
+from helpers.cache import get_repository_cache
+from helpers.cache_events import CacheInvalidationListener, cache_events_enabled
+from helpers.json_provider import configure_json
+from helpers.otp_store import get_otp_store
+from helpers.rate_limit import get_rate_limiter
+from helpers.sms_queue import get_sms_queue
+from middleware.internal_access import internal_required
+from models.otp_partitions import OtpPartitionManager, OtpPartitionScheduler, maintenance_settings
 
 app = Flask(__name__)
 
+# JSON encoding for responses (JSON_PROVIDER=fast for the ISO-datetime, orjson-backed provider)
+configure_json(app)
+
 # Session configuration
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
 app.permanent_session_lifetime = timedelta(days=7)  # Sessions last 7 days
@@ -43,6 +56,55 @@ def api_info():
         "status": "healthy"
     }), 200
 
+# Operational stats endpoint (token or loopback only)
+@app.route('/api/internal/stats', methods=['GET'])
+@internal_required
+def internal_stats():
+    """Pool, cache, OTP, rate limit and SMS queue internals for operators"""
+    return jsonify({
+        "database_pool": get_db_manager().pool_stats(),
+        "search_index": offering_search_index.stats() if offering_search_index else None,
+        "repository_cache": repository_cache.stats() if repository_cache else None,
+        "cache_listener": cache_listener.stats() if cache_listener else None,
+        "search_cache": search_cache.stats() if search_cache else None,
+        "otp_store": otp_store.stats() if otp_store else None,
+        "otp_partitions": otp_partition_scheduler.stats() if otp_partition_scheduler else None,
+        "rate_limit": get_rate_limiter().stats() if get_rate_limiter() else None,
+        "sms_queue": get_sms_queue().stats() if get_sms_queue() else None
+    }), 200
+
+# Build the optional in-memory offering search index in the background
+offering_search_index = get_offering_search_index()
+if offering_search_index is not None:
+    offering_search_index.start(FacilitatorRepository(get_db_manager()).iter_active_offerings)
+
+# Optional profile/offerings read-through cache shared by the blueprints' repositories
+repository_cache = get_repository_cache()
+
+# Optional in-memory OTP store used by the auth blueprint instead of the phone_otps table
+otp_store = get_otp_store()
+
+# Optional background job creating upcoming phone_otps partitions and dropping expired ones
+otp_partition_scheduler = None
+if otp_store is None and os.getenv('OTP_PARTITION_MAINTENANCE', 'false').lower() == 'true':
+    otp_partition_scheduler = OtpPartitionScheduler(
+        OtpPartitionManager(get_db_manager(), **maintenance_settings()),
+        interval=float(os.getenv('OTP_PARTITION_INTERVAL', 3600))
+    )
+    otp_partition_scheduler.start()
+
+# Optional LISTEN thread applying other processes' invalidation events to the local caches
+cache_listener = None
+if cache_events_enabled():
+    local_repo = FacilitatorRepository(
+        get_db_manager(), search_index=offering_search_index, cache=repository_cache
+    )
+    cache_listener = CacheInvalidationListener(
+        get_db_manager().postgres_url, local_repo.apply_cache_event,
+        on_reconnect=local_repo.reset_local_caches
+    )
+    cache_listener.start()
+
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(facilitator_bp, url_prefix='/api/facilitator')
@@ -0,0 +1,38 @@
+import hmac
+import ipaddress
+import os
+from functools import wraps
+from flask import jsonify, request
+
+def internal_required(f):
+    """
+    Decorator restricting operational endpoints to operators.
+    With INTERNAL_API_TOKEN set, requires "Authorization: Bearer <token>"; without it,
+    only requests from the loopback interface (the host itself) are accepted.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = os.getenv('INTERNAL_API_TOKEN')
+        
+        if token:
+            header = request.headers.get('Authorization', '')
+            supplied = header[7:] if header.startswith('Bearer ') else ''
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return jsonify({
+                    "error": "Authentication required",
+                    "message": "A valid internal API token is required"
+                }), 401
+        else:
+            try:
+                is_loopback = ipaddress.ip_address(request.remote_addr or '').is_loopback
+            except ValueError:
+                is_loopback = False
+            if not is_loopback:
+                return jsonify({
+                    "error": "Forbidden",
+                    "message": "This endpoint is only available internally"
+                }), 403
+        
+        return f(*args, **kwargs)
+    
+    return decorated_function
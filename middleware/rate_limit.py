@@ -0,0 +1,38 @@
+import math
+from functools import wraps
+from flask import jsonify, request
+
+from helpers.rate_limit import get_rate_limiter
+
+def rate_limited(endpoint):
+    """
+    Decorator applying the rate limit rules of `endpoint` (see helpers.rate_limit) to the
+    request's phone number (JSON body "phone_number") and client IP.
+    Over the limit, responds 429 with Retry-After instead of calling the route.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            limiter = get_rate_limiter()
+            if limiter is None:
+                return f(*args, **kwargs)
+            
+            data = request.get_json(silent=True)
+            phone_number = data.get('phone_number') if isinstance(data, dict) else None
+            phone_number = phone_number.strip() if isinstance(phone_number, str) else None
+            
+            retry_after = limiter.check(endpoint, phone_number, request.remote_addr)
+            if retry_after:
+                response = jsonify({
+                    "error": "Too many requests",
+                    "message": "Too many attempts. Please try again later.",
+                    "retry_after": math.ceil(retry_after)
+                })
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response, 429
+            
+            return f(*args, **kwargs)
+        
+        return decorated_function
+    
+    return decorator
@@ -1,456 +1,1224 @@
+import csv
+import io
+import json
 import psycopg2
-from psycopg2.extras import DictCursor
+from psycopg2.extensions import cursor as TupleCursor, register_adapter
+from psycopg2.extras import DictCursor, Json, execute_values
 import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 from dotenv import load_dotenv
 import logging
 
+from models.pool import ConnectionPool
+from models.records import Facilitator, Offering
+from models.otp_partitions import OtpPartitionManager, maintenance_settings
+from helpers.cache_events import publish_cache_events
+
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Store dict parameters (profile sections, offering details) as JSON in JSONB columns
+register_adapter(dict, Json)
+
+# Offering columns returned to API clients (excludes the internal search_vector), in the
+# field order of the Offering record so a plain cursor row builds one with Offering(*row)
+OFFERING_COLUMNS = Offering.columns()
+OFFERING_COLUMN_NAMES = list(Offering.__slots__)
+FACILITATOR_COLUMNS = Facilitator.columns()
+UPDATABLE_OFFERING_FIELDS = ['title', 'description', 'category', 'basic_info', 'details', 'price_schedule']
+PROFILE_FIELDS = [
+    'email', 'name', 'basic_info', 'professional_details', 'bio_about',
+    'experience', 'certifications', 'visual_profile'
+]
+
+# Outcomes of the facilitator-scoped single offering methods
+OFFERING_OK = "ok"
+OFFERING_FORBIDDEN = "forbidden"  # no such offering, or it belongs to another facilitator
+OFFERING_NOT_FOUND = "not_found"  # owned by the facilitator but inactive
+OFFERING_ERROR = "error"
+OFFERING_SKIPPED = "skipped"  # not attempted because an all-or-nothing bulk operation aborted
+
+# SQL types for the VALUES list of the set-based bulk offering update
+OFFERING_FIELD_TYPES = {
+    'title': 'varchar', 'description': 'text', 'category': 'varchar',
+    'basic_info': 'jsonb', 'details': 'jsonb', 'price_schedule': 'jsonb'
+}
+
+# Breakdown dimensions for offering statistics: name -> SQL expression grouped on.
+# Add an entry here to make a new breakdown available to get_offering_statistics.
+OFFERING_STAT_DIMENSIONS = {
+    'category': "category",
+    'status': "CASE WHEN is_active THEN 'active' ELSE 'inactive' END",
+    'month': "to_char(date_trunc('month', created_at), 'YYYY-MM')"
+}
+
+# Marks the newest unverified, unexpired matching code as verified (served by the index
+# from migration 0007). FOR UPDATE makes a concurrent verification of the same code wait,
+# then re-check is_verified and match nothing. Codes live minutes, so the created_at bound
+# limits both the lookup and the UPDATE to the latest daily partitions (migration 0008).
+CLAIM_OTP_SQL = """
+    UPDATE phone_otps SET is_verified = TRUE
+    WHERE created_at > NOW() - INTERVAL '1 day'
+    AND (id, created_at) = (
+        SELECT id, created_at FROM phone_otps
+        WHERE phone_number = %(phone_number)s AND otp = %(otp)s AND otp_type = %(otp_type)s
+        AND expires_at > NOW() AND is_verified = FALSE
+        AND created_at > NOW() - INTERVAL '1 day'
+        ORDER BY created_at DESC
+        LIMIT 1
+        FOR UPDATE
+    )
+"""
+FACILITATOR_JOIN_COLUMNS = ", ".join(f"f.{column}" for column in Facilitator.__slots__)
+
+# Counter bumped by the offerings triggers in every write's transaction (migration 0009)
+OFFERINGS_VERSION_SQL = """
+    COALESCE((SELECT version FROM offering_versions WHERE facilitator_id = %(facilitator_id)s), 0)
+"""
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, postgres_url: str = None, min_size: int = None, max_size: int = None, timeout: float = None):
         # PostgreSQL setup
-        self.postgres_url = os.getenv("POSTGRES_URL")
-        self.connection = psycopg2.connect(self.postgres_url, cursor_factory=DictCursor)
-        self.cursor = self.connection.cursor()
-        # Setup tables        self._setup_tables()
+        self.postgres_url = postgres_url or os.getenv("POSTGRES_URL")
+        self.pool = ConnectionPool(
+            self.postgres_url,
+            min_size=min_size if min_size is not None else int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+            max_size=max_size if max_size is not None else int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            timeout=timeout if timeout is not None else float(os.getenv("DB_POOL_TIMEOUT", 5)),
+            cursor_factory=DictCursor
+        )
+        # Connection pinned to the current thread by transaction()
+        self._local = threading.local()
+        # Schema is managed by migrations: python -m models.migrate upgrade
+
+    @contextmanager
+    def transaction(self):
+        """
+        Borrow one pooled connection for the current thread and commit once on exit.
+        Nested transaction()/get_cursor() calls on the same thread join the outer one,
+        so a route can group several repository calls into a single unit of work.
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self.pool.getconn()
+        self._local.connection = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self._local.connection = None
+            self.pool.putconn(conn)
+
+    @contextmanager
+    def get_cursor(self, cursor_factory=None):
+        """
+        Borrow a cursor on a pooled connection; commits on success, rolls back on error.
+        Rows are DictRows unless `cursor_factory` is given: read paths that build
+        models.records pass TupleCursor to skip the per-row dict.
+        """
+        with self.transaction() as conn:
+            cursor = conn.cursor(cursor_factory=cursor_factory) if cursor_factory else conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def pool_stats(self):
+        """Connection pool usage counters"""
+        return self.pool.stats()
     
     def _setup_tables(self):
-        """Setup tables in PostgreSQL"""
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS facilitators (
-            id SERIAL PRIMARY KEY,
-            phone_number VARCHAR(20) UNIQUE NOT NULL,
-            email VARCHAR(255),
-            name VARCHAR(255),
-            basic_info JSONB,
-            professional_details JSONB,
-            bio_about JSONB,
-            experience JSONB,
-            certifications JSONB,
-            visual_profile JSONB,
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );        CREATE TABLE IF NOT EXISTS phone_otps (
-            id SERIAL PRIMARY KEY,
-            phone_number VARCHAR(20) NOT NULL,
-            otp VARCHAR(6) NOT NULL,
-            otp_type VARCHAR(20) NOT NULL DEFAULT 'verification', -- 'verification' for unified flow
-            expires_at TIMESTAMP NOT NULL,
-            is_verified BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-
-        CREATE TABLE IF NOT EXISTS offerings (
-            id SERIAL PRIMARY KEY,
-            facilitator_id INTEGER NOT NULL,
-            title VARCHAR(255) NOT NULL,
-            description TEXT,
-            category VARCHAR(100),
-            basic_info JSONB,
-            details JSONB,
-            price_schedule JSONB,
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """)
-        self.connection.commit()
+        """Apply pending schema migrations (see models/migrations)"""
+        from models.migrate import MigrationRunner
+        return MigrationRunner(self).upgrade()
 
     def close_connection(self):
-        self.cursor.close()
-        self.connection.close()
+        self.pool.closeall()
 
 # Repository pattern for cleaner data access
 class FacilitatorRepository:
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, search_index=None, cache=None, notify: bool = False,
+                 otp_store=None):
         self.db_manager = db_manager
+        # Optional in-memory offering search index kept in sync by the offering write paths
+        self.search_index = search_index
+        # Optional read-through cache (a helpers.cache.CacheBackend) for profile, offerings and
+        # phone lookups, invalidated by every write path below
+        self.cache = cache
+        # Publish invalidation events so other processes and hosts evict their copies too
+        self.notify = notify
+        # Optional helpers.otp_store.OtpStore holding OTPs instead of the phone_otps table
+        self.otp_store = otp_store
+
+    def _index_offering(self, offering: dict):
+        """Apply a written offering row to the search index (no-op when the index is disabled)"""
+        if self.search_index is not None and offering:
+            self.search_index.upsert(offering)
+
+    def _cached(self, key, loader):
+        """Serve `key` from the cache, calling loader() on a miss (loader returns None on error)"""
+        if self.cache is None:
+            return loader()
+        return self.cache.get_or_load(key, loader)
+
+    def _evict_facilitator(self, facilitator_id: int = None, phone_number: str = None):
+        """Drop the cached profile and phone lookup of a facilitator, and cached searches"""
+        if self.cache is not None:
+            self.cache.delete(('profile', facilitator_id), ('phone', phone_number))
+            self.cache.invalidate_namespace('search')
+
+    def _evict_offerings(self, facilitator_id: int):
+        """Drop the cached offering list of a facilitator, and cached searches"""
+        if self.cache is not None and facilitator_id is not None:
+            self.cache.delete(('offerings', facilitator_id))
+            self.cache.invalidate_namespace('search')
+
+    def _publish_facilitator(self, cursor, facilitator_id: int = None, phone_number: str = None):
+        """
+        Queue a facilitator invalidation for other processes on the write's own transaction,
+        so it is delivered on commit (and a failed NOTIFY fails the write)
+        """
+        if self.notify:
+            publish_cache_events(cursor, [{"entity": "facilitator", "id": facilitator_id, "phone_number": phone_number}])
+
+    def _publish_offerings(self, cursor, facilitator_id: int, offering_ids: list):
+        """Queue an offering invalidation for other processes on the write's own transaction"""
+        if self.notify:
+            publish_cache_events(
+                cursor, [{"entity": "offering", "id": list(offering_ids), "facilitator_id": facilitator_id}]
+            )
+
+    def apply_cache_event(self, event: dict):
+        """Apply an invalidation event published by another process to the local caches"""
+        if event['entity'] == 'facilitator':
+            self._evict_facilitator(event['id'], event.get('phone_number'))
+        elif event['entity'] == 'offering':
+            self._evict_offerings(event['facilitator_id'])
+            if self.search_index is not None:
+                self._refresh_indexed_offerings(event['id'])
+
+    def reset_local_caches(self):
+        """Forget everything cached locally, e.g. after invalidation events may have been missed"""
+        if self.cache is not None:
+            self.cache.clear()
+        if self.search_index is not None:
+            self.search_index.mark_stale()
+
+    def _refresh_indexed_offerings(self, offering_ids: list):
+        """Re-read offerings written by another process into the search index"""
+        try:
+            with self.db_manager.get_cursor(TupleCursor) as cursor:
+                cursor.execute(
+                    f"SELECT {OFFERING_COLUMNS} FROM offerings WHERE id = ANY(%s);",
+                    (list(offering_ids),)
+                )
+                rows = [Offering(*row) for row in cursor.fetchall()]
+        except psycopg2.Error as e:
+            print(f"Error refreshing indexed offerings: {e}")
+            self.search_index.mark_stale()
+            return
+        for row in rows:
+            self.search_index.upsert(row)
+        for offering_id in set(offering_ids) - {row['id'] for row in rows}:
+            self.search_index.remove(offering_id)
 
     def create_facilitator(self, phone_number: str, email: str = None, name: str = None):
         """Create a new facilitator"""
         try:
-            self.db_manager.cursor.execute(
-                """
-                INSERT INTO facilitators (phone_number, email, name, is_active, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                RETURNING id;
-                """,
-                (phone_number, email, name, True)
-            )
-            facilitator_id = self.db_manager.cursor.fetchone()[0]
-            self.db_manager.connection.commit()
-            return facilitator_id
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO facilitators (phone_number, email, name, is_active, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    RETURNING id;
+                    """,
+                    (phone_number, email, name, True)
+                )
+                facilitator_id = cursor.fetchone()[0]
+                self._publish_facilitator(cursor, facilitator_id, phone_number)
         except psycopg2.Error as e:
             print(f"Error creating facilitator: {e}")
             return None
+        self._evict_facilitator(facilitator_id, phone_number)
+        return facilitator_id
 
     def update_facilitator_profile(self, facilitator_id: int, update_data: dict):
-        """Update facilitator profile"""
+        """
+        Update the profile fields present in `update_data` and return the updated profile.
+        Fields missing from `update_data` keep their current values.
+        """
+        fields = [field for field in PROFILE_FIELDS if field in update_data]
+        if not fields:
+            return self.get_facilitator_profile(facilitator_id)
+        set_clause = ", ".join(f"{field} = %s" for field in fields)
         try:
-            self.db_manager.cursor.execute(
-                """
-                UPDATE facilitators
-                SET basic_info = %s, professional_details = %s, bio_about = %s,
-                    experience = %s, certifications = %s, visual_profile = %s,
-                    email = %s, name = %s, updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s;
-                """,
-                (
-                    update_data.get("basic_info"),
-                    update_data.get("professional_details"),
-                    update_data.get("bio_about"),
-                    update_data.get("experience"),
-                    update_data.get("certifications"),
-                    update_data.get("visual_profile"),
-                    update_data.get("email"),
-                    update_data.get("name"),
-                    facilitator_id
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE facilitators
+                    SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                    RETURNING *;
+                    """,
+                    tuple(update_data[field] for field in fields) + (facilitator_id,)
                 )
-            )
-            self.db_manager.connection.commit()
+                profile = cursor.fetchone()
+                profile = dict(profile) if profile else None
+                self._publish_facilitator(cursor, facilitator_id, profile['phone_number'] if profile else None)
         except psycopg2.Error as e:
             print(f"Error updating facilitator profile: {e}")
+            return None
+        self._evict_facilitator(facilitator_id, profile['phone_number'] if profile else None)
+        return profile
 
     def get_facilitator_profile(self, facilitator_id: int):
         """Get complete facilitator profile"""
+        return self._cached(('profile', facilitator_id), lambda: self._load_facilitator_profile(facilitator_id))
+
+    def _load_facilitator_profile(self, facilitator_id: int):
         try:
-            self.db_manager.cursor.execute(
-                """
-                SELECT * FROM facilitators
-                WHERE id = %s;
-                """,
-                (facilitator_id,)
-            )
-            profile = self.db_manager.cursor.fetchone()
-            return dict(profile) if profile else None
+            with self.db_manager.get_cursor(TupleCursor) as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT {FACILITATOR_COLUMNS} FROM facilitators
+                    WHERE id = %s;
+                    """,
+                    (facilitator_id,)
+                )
+                profile = cursor.fetchone()
+                return Facilitator(*profile) if profile else None
         except psycopg2.Error as e:
             print(f"Error fetching facilitator profile: {e}")
             return None
 
     def create_offering(self, facilitator_id: int, offering_data: dict):
-        """Create a new offering for a facilitator"""
+        """Create a new offering for a facilitator and return the stored row"""
         try:
-            self.db_manager.cursor.execute(
-                """
-                INSERT INTO offerings (facilitator_id, title, description, category, 
-                                     basic_info, details, price_schedule, is_active, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                RETURNING id;
-                """,
-                (
-                    facilitator_id,
-                    offering_data.get("title"),
-                    offering_data.get("description"),
-                    offering_data.get("category"),
-                    offering_data.get("basic_info"),
-                    offering_data.get("details"),
-                    offering_data.get("price_schedule"),
-                    True
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO offerings (facilitator_id, title, description, category, 
+                                         basic_info, details, price_schedule, is_active, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    RETURNING {OFFERING_COLUMNS};
+                    """,
+                    (
+                        facilitator_id,
+                        offering_data.get("title"),
+                        offering_data.get("description"),
+                        offering_data.get("category"),
+                        offering_data.get("basic_info"),
+                        offering_data.get("details"),
+                        offering_data.get("price_schedule"),
+                        True
+                    )
                 )
-            )
-            offering_id = self.db_manager.cursor.fetchone()[0]
-            self.db_manager.connection.commit()
-            return offering_id
+                offering = dict(cursor.fetchone())
+                self._publish_offerings(cursor, facilitator_id, [offering['id']])
         except psycopg2.Error as e:
             print(f"Error creating offering: {e}")
             return None
+        self._index_offering(offering)
+        self._evict_offerings(facilitator_id)
+        return offering
+
+    def bulk_create_offerings(self, facilitator_id: int, offerings: list):
+        """
+        Insert many validated offerings in one transaction and return their ids in input order.
+        Rows are streamed with COPY into a temporary staging table, then moved into
+        offerings with a single INSERT ... SELECT so the serial ids come back via RETURNING.
+        Returns None on a database error (nothing is inserted).
+        """
+        buffer = io.StringIO()
+        # QUOTE_NOTNULL writes None unquoted, which COPY's CSV format reads as NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+        for seq, offering in enumerate(offerings):
+            writer.writerow([seq] + [
+                json.dumps(offering.get(field)) if OFFERING_FIELD_TYPES[field] == 'jsonb'
+                and offering.get(field) is not None else offering.get(field)
+                for field in UPDATABLE_OFFERING_FIELDS
+            ])
+        buffer.seek(0)
+
+        fields = ", ".join(UPDATABLE_OFFERING_FIELDS)
+        returning = OFFERING_COLUMNS if self.search_index is not None else "id"
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """
+                    CREATE TEMP TABLE offerings_import (
+                        seq INTEGER,
+                        title VARCHAR(255),
+                        description TEXT,
+                        category VARCHAR(100),
+                        basic_info JSONB,
+                        details JSONB,
+                        price_schedule JSONB
+                    ) ON COMMIT DROP;
+                    """
+                )
+                cursor.copy_expert(
+                    f"COPY offerings_import (seq, {fields}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+                cursor.execute(
+                    f"""
+                    INSERT INTO offerings (facilitator_id, {fields}, is_active, created_at, updated_at)
+                    SELECT %s, {fields}, TRUE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    FROM offerings_import
+                    ORDER BY seq
+                    RETURNING {returning};
+                    """,
+                    (facilitator_id,)
+                )
+                rows = cursor.fetchall()
+                self._publish_offerings(cursor, facilitator_id, [row['id'] for row in rows])
+        except psycopg2.Error as e:
+            print(f"Error bulk creating offerings: {e}")
+            return None
+
+        self._evict_offerings(facilitator_id)
+        if self.search_index is not None:
+            for row in rows:
+                self._index_offering(dict(row))
+        # Serial ids are assigned in insertion order, which follows seq
+        return sorted(row['id'] for row in rows)
 
     def update_offering(self, offering_id: int, update_data: dict):
-        """Update an offering"""
+        """
+        Update the offering fields present in `update_data` and return the updated row
+        (None if the offering doesn't exist or the update failed).
+        """
+        fields = [field for field in UPDATABLE_OFFERING_FIELDS if field in update_data]
+        if not fields:
+            return None
+        set_clause = ", ".join(f"{field} = %s" for field in fields)
         try:
-            self.db_manager.cursor.execute(
-                """
-                UPDATE offerings
-                SET title = %s, description = %s, category = %s,
-                    basic_info = %s, details = %s, price_schedule = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s;
-                """,
-                (
-                    update_data.get("title"),
-                    update_data.get("description"),
-                    update_data.get("category"),
-                    update_data.get("basic_info"),
-                    update_data.get("details"),
-                    update_data.get("price_schedule"),
-                    offering_id
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE offerings
+                    SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                    RETURNING {OFFERING_COLUMNS};
+                    """,
+                    tuple(update_data[field] for field in fields) + (offering_id,)
                 )
-            )
-            self.db_manager.connection.commit()
+                offering = cursor.fetchone()
+                offering = dict(offering) if offering else None
+                if offering:
+                    self._publish_offerings(cursor, offering['facilitator_id'], [offering_id])
         except psycopg2.Error as e:
             print(f"Error updating offering: {e}")
+            return None
+        self._index_offering(offering)
+        if offering:
+            self._evict_offerings(offering['facilitator_id'])
+        return offering
+
+    def bulk_update_offerings(self, facilitator_id: int, updates: dict, atomic: bool = False,
+                              batch_size: int = 500):
+        """
+        Apply {offering_id: {field: value}} for one facilitator in a single transaction.
+        Ownership of the whole batch is checked (and the rows locked) with one query, then
+        rows are updated batch_size at a time with UPDATE ... FROM (VALUES ...), where a
+        has_<field> flag per row leaves fields it doesn't mention unchanged.
+        With `atomic`, a forbidden id or failed batch rolls everything back; otherwise a
+        failed batch is rolled back to a savepoint and the other batches still commit.
+        Returns ({offering_id: OFFERING_* status}, [updated rows]).
+        """
+        ids = list(updates)
+        results = {}
+        updated = []
+        if not ids:
+            return results, updated
+
+        fields = UPDATABLE_OFFERING_FIELDS
+        template = "(%s::integer, " + ", ".join(
+            f"%s::boolean, %s::{OFFERING_FIELD_TYPES[field]}" for field in fields
+        ) + ")"
+        values_columns = "id, " + ", ".join(f"has_{field}, {field}" for field in fields)
+        set_clause = ", ".join(
+            f"{field} = CASE WHEN v.has_{field} THEN v.{field} ELSE o.{field} END" for field in fields
+        )
+        returning = ", ".join(f"o.{column}" for column in OFFERING_COLUMN_NAMES)
+        # execute_values fills the one remaining %s with the VALUES list; the facilitator id
+        # is bound first, with mogrify
+        query = f"""
+            UPDATE offerings AS o
+            SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+            FROM (VALUES %%s) AS v ({values_columns})
+            WHERE o.id = v.id AND o.facilitator_id = %s
+            RETURNING {returning};
+        """
+
+        try:
+            with self.db_manager.transaction() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT id FROM offerings
+                        WHERE facilitator_id = %s AND id = ANY(%s)
+                        FOR UPDATE;
+                        """,
+                        (facilitator_id, ids)
+                    )
+                    owned = {row[0] for row in cursor.fetchall()}
+                    for offering_id in ids:
+                        if offering_id not in owned:
+                            results[offering_id] = OFFERING_FORBIDDEN
+                    if atomic and results:
+                        results.update({offering_id: OFFERING_SKIPPED for offering_id in owned})
+                        return results, updated
+
+                    owned_ids = [offering_id for offering_id in ids if offering_id in owned]
+                    batch_query = cursor.mogrify(query, (facilitator_id,))
+                    for start in range(0, len(owned_ids), batch_size):
+                        batch = owned_ids[start:start + batch_size]
+                        rows = []
+                        for offering_id in batch:
+                            row = [offering_id]
+                            for field in fields:
+                                row.extend([field in updates[offering_id], updates[offering_id].get(field)])
+                            rows.append(tuple(row))
+
+                        if not atomic:
+                            cursor.execute("SAVEPOINT bulk_update_batch;")
+                        try:
+                            returned = execute_values(
+                                cursor, batch_query, rows, template=template, page_size=len(rows), fetch=True
+                            )
+                        except psycopg2.Error as e:
+                            if atomic:
+                                raise
+                            print(f"Error bulk updating offerings batch: {e}")
+                            cursor.execute("ROLLBACK TO SAVEPOINT bulk_update_batch;")
+                            results.update({offering_id: OFFERING_ERROR for offering_id in batch})
+                            continue
+                        if not atomic:
+                            cursor.execute("RELEASE SAVEPOINT bulk_update_batch;")
+                        for row in returned:
+                            results[row['id']] = OFFERING_OK
+                            updated.append(dict(row))
+                    if updated:
+                        self._publish_offerings(cursor, facilitator_id, [offering['id'] for offering in updated])
+        except psycopg2.Error as e:
+            print(f"Error bulk updating offerings: {e}")
+            return {offering_id: OFFERING_ERROR for offering_id in ids}, []
+
+        if updated:
+            self._evict_offerings(facilitator_id)
+        for offering in updated:
+            self._index_offering(offering)
+        return results, updated
+
+    def set_offerings_active(self, facilitator_id: int, offering_ids: list, active: bool):
+        """
+        Soft delete (active=False) or reactivate every listed offering the facilitator owns
+        in one UPDATE ... WHERE id = ANY(...) RETURNING statement.
+        Returns the ids that changed, or None on a database error; ids missing from the
+        result were not found or belong to another facilitator.
+        """
+        returning = OFFERING_COLUMNS if self.search_index is not None else "id"
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE offerings
+                    SET is_active = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE facilitator_id = %s AND id = ANY(%s)
+                    RETURNING {returning};
+                    """,
+                    (active, facilitator_id, list(offering_ids))
+                )
+                rows = cursor.fetchall()
+                if rows:
+                    self._publish_offerings(cursor, facilitator_id, [row['id'] for row in rows])
+        except psycopg2.Error as e:
+            print(f"Error bulk {'activating' if active else 'deleting'} offerings: {e}")
+            return None
+
+        if rows:
+            self._evict_offerings(facilitator_id)
+        if self.search_index is not None:
+            for row in rows:
+                self._index_offering(dict(row))
+        return [row['id'] for row in rows]
 
     def delete_offering(self, offering_id: int):
         """Soft delete an offering by setting is_active to False"""
         try:
-            self.db_manager.cursor.execute(
-                """
-                UPDATE offerings
-                SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s;
-                """,
-                (offering_id,)
-            )
-            self.db_manager.connection.commit()
-            return True
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE offerings
+                    SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                    RETURNING facilitator_id;
+                    """,
+                    (offering_id,)
+                )
+                offering = cursor.fetchone()
+                if offering:
+                    self._publish_offerings(cursor, offering['facilitator_id'], [offering_id])
         except psycopg2.Error as e:
             print(f"Error deleting offering: {e}")
             return False
+        if offering:
+            self._evict_offerings(offering['facilitator_id'])
+        if self.search_index is not None:
+            self.search_index.remove(offering_id)
+        return True
+
+    def activate_offering(self, offering_id: int):
+        """Reactivate a soft-deleted offering"""
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE offerings
+                    SET is_active = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                    RETURNING {OFFERING_COLUMNS};
+                    """,
+                    (offering_id,)
+                )
+                offering = cursor.fetchone()
+                if offering:
+                    self._publish_offerings(cursor, offering['facilitator_id'], [offering_id])
+        except psycopg2.Error as e:
+            print(f"Error activating offering: {e}")
+            return False
+        if offering:
+            self._index_offering(dict(offering))
+            self._evict_offerings(offering['facilitator_id'])
+        return True
 
     def get_facilitator_offerings(self, facilitator_id: int):
         """Get all offerings for a facilitator"""
+        return self.get_versioned_offerings(facilitator_id)[0]
+
+    def get_versioned_offerings(self, facilitator_id: int):
+        """
+        (offerings, version) of a facilitator's active offerings, read in one statement so the
+        version (see get_offerings_version) matches the list. ([], None) on a database error.
+        """
+        loaded = self._cached(
+            ('offerings', facilitator_id), lambda: self._load_facilitator_offerings(facilitator_id)
+        )
+        if loaded is None:
+            return [], None
+        version, offerings = loaded
+        return offerings, version
+
+    def _load_facilitator_offerings(self, facilitator_id: int):
+        """(version, offerings) of a facilitator; cached as one value so they stay in step"""
         try:
-            self.db_manager.cursor.execute(
-                """
-                SELECT * FROM offerings
-                WHERE facilitator_id = %s AND is_active = TRUE;
-                """,
-                (facilitator_id,)
-            )
-            offerings = self.db_manager.cursor.fetchall()
-            return [dict(offering) for offering in offerings]
+            with self.db_manager.get_cursor(TupleCursor) as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT v.version, o.*
+                    FROM (SELECT {OFFERINGS_VERSION_SQL} AS version) v
+                    LEFT JOIN LATERAL (
+                        SELECT {OFFERING_COLUMNS} FROM offerings
+                        WHERE facilitator_id = %(facilitator_id)s AND is_active = TRUE
+                    ) o ON TRUE;
+                    """,
+                    {"facilitator_id": facilitator_id}
+                )
+                rows = cursor.fetchall()
+                # No offerings: the single row carries the version and NULL columns
+                return rows[0][0], [Offering(*row[1:]) for row in rows if row[1] is not None]
         except psycopg2.Error as e:
             print(f"Error fetching facilitator offerings: {e}")
-            return []
+            return None
 
-    def search_facilitators(self, filters: dict = None, page: int = 1, limit: int = 10):
-        """Search facilitators with filters and pagination"""
-        query = "SELECT * FROM facilitators WHERE is_active = TRUE"
-        params = []
+    def get_facilitator_offerings_json(self, facilitator_id: int, category: str = None):
+        """
+        Active offerings of a facilitator as JSON text built by Postgres with json_agg,
+        for responses that pass it through without decoding the JSONB columns in Python.
+        `category` filters case-insensitively. Also returns the facilitator's offerings
+        version (see get_offerings_version) for ETags, read in the same statement.
+        Returns (offerings_json, matched_count, version) or None on a database error.
+        """
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT
+                        COALESCE(
+                            json_agg(o) FILTER (WHERE %(category)s IS NULL OR lower(o.category) = lower(%(category)s)),
+                            '[]'
+                        )::text AS offerings,
+                        COUNT(*) FILTER (WHERE %(category)s IS NULL OR lower(o.category) = lower(%(category)s)) AS matched,
+                        {OFFERINGS_VERSION_SQL} AS version
+                    FROM (
+                        SELECT {OFFERING_COLUMNS} FROM offerings
+                        WHERE facilitator_id = %(facilitator_id)s AND is_active = TRUE
+                    ) o;
+                    """,
+                    {"facilitator_id": facilitator_id, "category": category}
+                )
+                row = cursor.fetchone()
+                return row['offerings'], row['matched'], row['version']
+        except psycopg2.Error as e:
+            print(f"Error fetching facilitator offerings as JSON: {e}")
+            return None
 
-        if filters:
-            for key, value in filters.items():
-                if key in ['name', 'email']:  # Only allow safe columns for direct filtering
-                    query += f" AND {key} ILIKE %s"
-                    params.append(f"%{value}%")
+    def get_offering_statistics(self, facilitator_id: int, dimensions=('category',)):
+        """
+        Overall and per-dimension offering counts for a facilitator in one scan.
+        Each dimension in OFFERING_STAT_DIMENSIONS becomes a grouping set next to the
+        empty (overall) set; GROUPING() tells the result rows apart.
+        Returns {"overall": {...}, "breakdowns": {dimension: [{"value", counts...}]}} or None.
+        """
+        expressions = [OFFERING_STAT_DIMENSIONS[dimension] for dimension in dimensions]
+        columns = "".join(
+            f"GROUPING({expression}) AS grouped_{i}, {expression} AS value_{i}, "
+            for i, expression in enumerate(expressions)
+        )
+        grouping_sets = ", ".join(["()"] + [f"({expression})" for expression in expressions])
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT {columns}
+                        COUNT(*) AS total_offerings,
+                        COUNT(*) FILTER (WHERE is_active = TRUE) AS active_offerings,
+                        COUNT(*) FILTER (WHERE is_active = FALSE) AS inactive_offerings,
+                        COUNT(DISTINCT category) AS unique_categories
+                    FROM offerings
+                    WHERE facilitator_id = %s
+                    GROUP BY GROUPING SETS ({grouping_sets})
+                    ORDER BY total_offerings DESC;
+                    """,
+                    (facilitator_id,)
+                )
+                rows = cursor.fetchall()
+        except psycopg2.Error as e:
+            print(f"Error fetching offering statistics: {e}")
+            return None
 
-        query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
-        params.extend([limit, (page - 1) * limit])
+        stats = {
+            "overall": {"total_offerings": 0, "active_offerings": 0,
+                        "inactive_offerings": 0, "unique_categories": 0},
+            "breakdowns": {dimension: [] for dimension in dimensions}
+        }
+        for row in rows:
+            counts = {
+                "total_offerings": row['total_offerings'],
+                "active_offerings": row['active_offerings'],
+                "inactive_offerings": row['inactive_offerings']
+            }
+            # A row is a dimension's breakdown when that dimension is the one not rolled up
+            dimension = next(
+                (d for i, d in enumerate(dimensions) if row[f'grouped_{i}'] == 0), None
+            )
+            if dimension is None:
+                stats["overall"] = {**counts, "unique_categories": row['unique_categories']}
+            else:
+                value = row[f'value_{dimensions.index(dimension)}']
+                stats["breakdowns"][dimension].append({"value": value, **counts})
+        return stats
 
+    def get_facilitator_dashboard(self, facilitator_id: int):
+        """
+        Profile, active offerings and offering counters in one statement.
+        The offerings are aggregated server-side with json_agg in a lateral subquery.
+        Returns {"profile", "offerings", "total_offerings", "active_offerings"} or None.
+        """
         try:
-            self.db_manager.cursor.execute(query, tuple(params))
-            facilitators = self.db_manager.cursor.fetchall()
-            return [dict(facilitator) for facilitator in facilitators]
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT f.*, o.offerings, o.total_offerings, o.active_offerings
+                    FROM facilitators f
+                    CROSS JOIN LATERAL (
+                        SELECT
+                            COALESCE(
+                                json_agg(to_jsonb(offerings) - 'search_vector' ORDER BY created_at DESC, id DESC)
+                                    FILTER (WHERE is_active = TRUE),
+                                '[]'
+                            ) AS offerings,
+                            COUNT(*) AS total_offerings,
+                            COUNT(*) FILTER (WHERE is_active = TRUE) AS active_offerings
+                        FROM offerings
+                        WHERE facilitator_id = f.id
+                    ) o
+                    WHERE f.id = %s;
+                    """,
+                    (facilitator_id,)
+                )
+                row = cursor.fetchone()
         except psycopg2.Error as e:
-            print(f"Error searching facilitators: {e}")
-            return []
+            print(f"Error fetching facilitator dashboard: {e}")
+            return None
+
+        if not row:
+            return None
+        profile = dict(row)
+        offerings = profile.pop('offerings')
+        # json_agg renders timestamps as ISO strings; restore them so they serialize like other rows
+        for offering in offerings:
+            for column in ('created_at', 'updated_at'):
+                if offering.get(column):
+                    offering[column] = datetime.fromisoformat(offering[column])
+        return {
+            "profile": profile,
+            "offerings": offerings,
+            "total_offerings": profile.pop('total_offerings'),
+            "active_offerings": profile.pop('active_offerings')
+        }
 
-    def search_offerings(self, filters: dict = None, page: int = 1, limit: int = 10):
-        """Search offerings with filters and pagination"""
-        query = "SELECT * FROM offerings WHERE is_active = TRUE"
-        params = []
+    def iter_active_offerings(self, batch_size: int = 2000):
+        """Stream every active offering through a server-side cursor (used to build the search index)"""
+        with self.db_manager.transaction() as conn:
+            with conn.cursor(name="active_offerings_scan", cursor_factory=TupleCursor) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(f"SELECT {OFFERING_COLUMNS} FROM offerings WHERE is_active = TRUE;")
+                for offering in cursor:
+                    yield Offering(*offering)
+
+    def _search(self, table: str, record, columns: list, filters: dict, page: int, limit: int,
+                after: tuple, ranked: bool, label: str):
+        """
+        Shared search over active rows of `table` with substring filters on `columns`.
+        The ILIKE predicates are served by the pg_trgm GIN indexes (migration 0004).
+        Rows are returned as `record` instances; with `ranked`, the same rows are ordered
+        by trigram word similarity to the search terms and returned as dicts carrying a
+        `search_rank` column. Returns None on a database error.
+        """
+        select = record.columns()
+        where = " WHERE is_active = TRUE"
+        where_params = []
+        rank_terms = []
+        rank_params = []
 
         if filters:
             for key, value in filters.items():
-                if key in ['title', 'description', 'category']:  # Only allow safe columns
-                    query += f" AND {key} ILIKE %s"
-                    params.append(f"%{value}%")
+                if key in columns:  # Only allow safe columns for direct filtering
+                    where += f" AND {key} ILIKE %s"
+                    where_params.append(f"%{value}%")
+                    rank_terms.append(f"word_similarity(%s, {key})")
+                    rank_params.append(value)
+
+        if after:
+            where += " AND (created_at, id) < (%s, %s)"
+            where_params.extend(after)
 
-        query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
+        if ranked and rank_terms:
+            query = f"SELECT {select}, ({' + '.join(rank_terms)}) AS search_rank FROM {table}" + where
+            query += " ORDER BY search_rank DESC, created_at DESC, id DESC LIMIT %s OFFSET %s"
+            params = rank_params + where_params
+        else:
+            query = f"SELECT {select} FROM {table}" + where
+            query += " ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s"
+            params = where_params
         params.extend([limit, (page - 1) * limit])
 
         try:
-            self.db_manager.cursor.execute(query, tuple(params))
-            offerings = self.db_manager.cursor.fetchall()
-            return [dict(offering) for offering in offerings]
+            if ranked and rank_terms:
+                with self.db_manager.get_cursor() as cursor:
+                    cursor.execute(query, tuple(params))
+                    return [dict(row) for row in cursor.fetchall()]
+            with self.db_manager.get_cursor(TupleCursor) as cursor:
+                cursor.execute(query, tuple(params))
+                return [record(*row) for row in cursor.fetchall()]
         except psycopg2.Error as e:
-            print(f"Error searching offerings: {e}")
-            return []
+            print(f"Error searching {label}: {e}")
+            return None
+
+    def search_facilitators(self, filters: dict = None, page: int = 1, limit: int = 10,
+                            after: tuple = None, ranked: bool = False):
+        """
+        Search facilitators with filters and pagination.
+        Pass `after` as a (created_at, id) keyset position to read the rows that follow it
+        instead of skipping (page - 1) * limit rows with OFFSET.
+        """
+        return self._search(
+            "facilitators", Facilitator, ['name', 'email'], filters, page, limit, after, ranked, "facilitators"
+        )
+
+    def search_offerings(self, filters: dict = None, page: int = 1, limit: int = 10,
+                         after: tuple = None, ranked: bool = False):
+        """
+        Search offerings with filters and pagination.
+        Pass `after` as a (created_at, id) keyset position to read the rows that follow it
+        instead of skipping (page - 1) * limit rows with OFFSET.
+        """
+        return self._search(
+            "offerings", Offering, ['title', 'description', 'category'], filters, page, limit, after, ranked, "offerings"
+        )
+
+    def search_offerings_fulltext(self, tsquery: str, page: int = 1, limit: int = 10):
+        """
+        Full-text search over active offerings, best matches first.
+        `tsquery` is a to_tsquery() expression (see helpers.fulltext.build_tsquery);
+        title matches outrank category, description and details matches.
+        Returns None on a database error.
+        """
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT {OFFERING_COLUMNS}, ts_rank_cd(search_vector, query) AS search_rank
+                    FROM offerings, to_tsquery('english', %s) AS query
+                    WHERE is_active = TRUE AND search_vector @@ query
+                    ORDER BY search_rank DESC, created_at DESC, id DESC
+                    LIMIT %s OFFSET %s;
+                    """,
+                    (tsquery, limit, (page - 1) * limit)
+                )
+                offerings = cursor.fetchall()
+                return [dict(offering) for offering in offerings]
+        except psycopg2.Error as e:
+            print(f"Error running full-text offering search: {e}")
+            return None
 
     def get_facilitator_by_phone(self, phone_number: str):
         """Get facilitator by phone number for authentication"""
+        return self._cached(('phone', phone_number), lambda: self._load_facilitator_by_phone(phone_number))
+
+    def _load_facilitator_by_phone(self, phone_number: str):
         try:
-            self.db_manager.cursor.execute(
-                """
-                SELECT * FROM facilitators
-                WHERE phone_number = %s AND is_active = TRUE;
-                """,
-                (phone_number,)
-            )
-            facilitator = self.db_manager.cursor.fetchone()
-            return dict(facilitator) if facilitator else None
+            with self.db_manager.get_cursor(TupleCursor) as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT {FACILITATOR_COLUMNS} FROM facilitators
+                    WHERE phone_number = %s AND is_active = TRUE;
+                    """,
+                    (phone_number,)
+                )
+                facilitator = cursor.fetchone()
+                return Facilitator(*facilitator) if facilitator else None
         except psycopg2.Error as e:
             print(f"Error fetching facilitator by phone: {e}")
             return None
 
     def create_otp(self, phone_number: str, otp: str, expires_in_minutes: int = 10):
         """Create OTP for phone verification (unified for all users)"""
+        if self.otp_store is not None:
+            return self.otp_store.create(phone_number, otp, 'verification', expires_in_minutes * 60)
         try:
-            self.db_manager.cursor.execute(
-                """
-                INSERT INTO phone_otps (phone_number, otp, otp_type, expires_at, is_verified, created_at)
-                VALUES (%s, %s, %s, NOW() + INTERVAL '%s minutes', FALSE, CURRENT_TIMESTAMP)
-                RETURNING id;
-                """,
-                (phone_number, otp, 'verification', expires_in_minutes)
-            )
-            otp_id = self.db_manager.cursor.fetchone()[0]
-            self.db_manager.connection.commit()
-            return otp_id
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO phone_otps (phone_number, otp, otp_type, expires_at, is_verified, created_at)
+                    VALUES (%s, %s, %s, NOW() + INTERVAL '%s minutes', FALSE, CURRENT_TIMESTAMP)
+                    RETURNING id;
+                    """,
+                    (phone_number, otp, 'verification', expires_in_minutes)
+                )
+                otp_id = cursor.fetchone()[0]
+                return otp_id
         except psycopg2.Error as e:
             print(f"Error creating OTP: {e}")
             return None
 
     def verify_otp_and_get_user_status(self, phone_number: str, otp: str):
-        """Verify OTP and return user status (new/existing)"""
-        try:
-            # First verify the OTP
-            self.db_manager.cursor.execute(
-                """
-                SELECT id FROM phone_otps
-                WHERE phone_number = %s AND otp = %s AND otp_type = 'verification'
-                AND expires_at > NOW() AND is_verified = FALSE
-                ORDER BY created_at DESC
-                LIMIT 1;
-                """,
-                (phone_number, otp)
-            )
-            
-            otp_record = self.db_manager.cursor.fetchone()
-            
-            if not otp_record:
+        """
+        Verify OTP and return user status (new/existing).
+        Claiming the code and looking up the facilitator is one statement: the UPDATE
+        only succeeds for the transaction that flips is_verified, so a double submit
+        cannot verify the same code twice. With an OTP store the code is claimed there
+        and the facilitator is read through the cached phone lookup.
+        """
+        if self.otp_store is not None:
+            if not self.otp_store.claim(phone_number, otp, 'verification'):
                 return {"success": False, "message": "Invalid or expired OTP"}
-            
-            # Mark OTP as verified
-            self.db_manager.cursor.execute(
-                """
-                UPDATE phone_otps
-                SET is_verified = TRUE
-                WHERE id = %s;
-                """,
-                (otp_record['id'],)
-            )
-            self.db_manager.connection.commit()
-            
-            # Check if facilitator already exists
-            existing_facilitator = self.get_facilitator_by_phone(phone_number)
-            
-            if existing_facilitator:
-                # Existing user - redirect to dashboard
-                return {
-                    "success": True,
-                    "is_new_user": False,
-                    "facilitator": existing_facilitator,
-                    "phone_number": phone_number,
-                    "redirect_to": "dashboard"
-                }
-            else:
-                # New user - redirect to onboarding (NO profile creation yet)
-                return {
-                    "success": True,
-                    "is_new_user": True,
-                    "facilitator": None,
-                    "phone_number": phone_number,
-                    "redirect_to": "onboarding"
-                }
-                
+            return self._otp_user_status(phone_number, self.get_facilitator_by_phone(phone_number))
+        try:
+            with self.db_manager.get_cursor(TupleCursor) as cursor:
+                cursor.execute(
+                    f"""
+                    WITH verified AS (
+                        {CLAIM_OTP_SQL}
+                        RETURNING phone_number
+                    )
+                    SELECT {FACILITATOR_JOIN_COLUMNS}
+                    FROM verified v
+                    LEFT JOIN facilitators f ON f.phone_number = v.phone_number AND f.is_active = TRUE;
+                    """,
+                    {'phone_number': phone_number, 'otp': otp, 'otp_type': 'verification'}
+                )
+                row = cursor.fetchone()
         except psycopg2.Error as e:
             print(f"Error verifying OTP and checking user status: {e}")
             return {"success": False, "message": "Database error"}
+        
+        if not row:
+            return {"success": False, "message": "Invalid or expired OTP"}
+        return self._otp_user_status(phone_number, Facilitator(*row) if row[0] is not None else None)
+
+    def _otp_user_status(self, phone_number: str, facilitator):
+        """Result of a successful verification for an existing (facilitator) or new user"""
+        if facilitator:
+            # Existing user - redirect to dashboard
+            return {
+                "success": True,
+                "is_new_user": False,
+                "facilitator": facilitator,
+                "phone_number": phone_number,
+                "redirect_to": "dashboard"
+            }
+        # New user - redirect to onboarding (NO profile creation yet)
+        return {
+            "success": True,
+            "is_new_user": True,
+            "facilitator": None,
+            "phone_number": phone_number,
+            "redirect_to": "onboarding"
+        }
 
     def verify_otp(self, phone_number: str, otp: str, otp_type: str = 'verification'):
         """Simple OTP verification (for backward compatibility)"""
+        if self.otp_store is not None:
+            return self.otp_store.claim(phone_number, otp, otp_type)
         try:
-            self.db_manager.cursor.execute(
-                """
-                SELECT id FROM phone_otps
-                WHERE phone_number = %s AND otp = %s AND otp_type = %s
-                AND expires_at > NOW() AND is_verified = FALSE
-                ORDER BY created_at DESC
-                LIMIT 1;
-                """,
-                (phone_number, otp, otp_type)
-            )
-            
-            otp_record = self.db_manager.cursor.fetchone()
-            
-            if otp_record:
-                self.db_manager.cursor.execute(
-                    """
-                    UPDATE phone_otps
-                    SET is_verified = TRUE
-                    WHERE id = %s;
-                    """,
-                    (otp_record['id'],)
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"{CLAIM_OTP_SQL} RETURNING id;",
+                    {'phone_number': phone_number, 'otp': otp, 'otp_type': otp_type}
                 )
-                self.db_manager.connection.commit()
-                return True
-            return False
-            
+                return cursor.fetchone() is not None
         except psycopg2.Error as e:
             print(f"Error verifying OTP: {e}")
             return False
 
     def cleanup_expired_otps(self):
-        """Remove expired OTP records"""
-        try:
-            self.db_manager.cursor.execute(
-                """
-                DELETE FROM phone_otps
-                WHERE expires_at < NOW();
-                """
-            )
-            deleted_count = self.db_manager.cursor.rowcount
-            self.db_manager.connection.commit()
-            return deleted_count
-        except psycopg2.Error as e:
-            print(f"Error cleaning up expired OTPs: {e}")
-            return 0
+        """
+        Remove expired OTP records by dropping the daily phone_otps partitions that only
+        hold expired codes (see models.otp_partitions); returns the number of rows removed.
+        """
+        if self.otp_store is not None:
+            return self.otp_store.purge_expired()
+        result = OtpPartitionManager(self.db_manager, **maintenance_settings()).maintain()
+        return result["rows_dropped"] if result else 0
 
     def verify_offering_ownership(self, facilitator_id: int, offering_id: int):
         """Verify that the offering belongs to the facilitator"""
         try:
-            self.db_manager.cursor.execute(
-                """
-                SELECT 1 FROM offerings
-                WHERE id = %s AND facilitator_id = %s;
-                """,
-                (offering_id, facilitator_id)
-            )
-            return self.db_manager.cursor.fetchone() is not None
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT 1 FROM offerings
+                    WHERE id = %s AND facilitator_id = %s;
+                    """,
+                    (offering_id, facilitator_id)
+                )
+                return cursor.fetchone() is not None
         except psycopg2.Error as e:
             print(f"Error verifying offering ownership: {e}")
             return False
 
+    def _scoped_offering_result(self, row, require_active: bool = True):
+        """Map a row carrying an `owned` flag to (status, offering)"""
+        if row is None or not row['owned']:
+            return OFFERING_FORBIDDEN, None
+        if row['id'] is None or (require_active and not row['is_active']):
+            return OFFERING_NOT_FOUND, None
+        return OFFERING_OK, {column: row[column] for column in OFFERING_COLUMN_NAMES}
+
+    def get_offering_for_facilitator(self, facilitator_id: int, offering_id: int):
+        """
+        Fetch one active offering owned by the facilitator in a single query.
+        Returns (status, offering) where status is one of the OFFERING_* outcomes.
+        """
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT facilitator_id = %s AS owned, {OFFERING_COLUMNS}
+                    FROM offerings
+                    WHERE id = %s;
+                    """,
+                    (facilitator_id, offering_id)
+                )
+                return self._scoped_offering_result(cursor.fetchone())
+        except psycopg2.Error as e:
+            print(f"Error fetching offering: {e}")
+            return OFFERING_ERROR, None
+
+    def get_profile_version(self, facilitator_id: int):
+        """
+        (id, updated_at) of a profile for ETag checks, from the cache when it holds the profile.
+        Returns None if the profile doesn't exist or on a database error.
+        """
+        if self.cache is not None:
+            profile = self.cache.get(('profile', facilitator_id))
+            if profile is not None:
+                return profile['id'], profile['updated_at']
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    "SELECT id, updated_at FROM facilitators WHERE id = %s;",
+                    (facilitator_id,)
+                )
+                row = cursor.fetchone()
+                return (row['id'], row['updated_at']) if row else None
+        except psycopg2.Error as e:
+            print(f"Error fetching profile version: {e}")
+            return None
+
+    def get_offerings_version(self, facilitator_id: int):
+        """
+        Version of a facilitator's offerings for ETag checks: a counter the offerings triggers
+        bump inside every create, update, delete or reactivation transaction, so it changes
+        with each committed write. Served from the cached offering list when present, else
+        by a primary key lookup. None on error.
+        """
+        if self.cache is not None:
+            loaded = self.cache.get(('offerings', facilitator_id))
+            if loaded is not None:
+                return loaded[0]
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {OFFERINGS_VERSION_SQL} AS version;",
+                    {"facilitator_id": facilitator_id}
+                )
+                return cursor.fetchone()['version']
+        except psycopg2.Error as e:
+            print(f"Error fetching offerings version: {e}")
+            return None
+
+    def get_offering_version(self, facilitator_id: int, offering_id: int):
+        """
+        (id, updated_at) of an active offering owned by the facilitator for ETag checks.
+        None when it isn't one (the full lookup then reports forbidden/not found) or on error.
+        """
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, updated_at FROM offerings
+                    WHERE id = %s AND facilitator_id = %s AND is_active = TRUE;
+                    """,
+                    (offering_id, facilitator_id)
+                )
+                row = cursor.fetchone()
+                return (row['id'], row['updated_at']) if row else None
+        except psycopg2.Error as e:
+            print(f"Error fetching offering version: {e}")
+            return None
+
+    def _scoped_offering_write(self, facilitator_id: int, offering_id: int, set_clause: str,
+                               params: dict, label: str):
+        """
+        Apply `set_clause` to one active offering owned by the facilitator.
+        The ownership check, update and not-found/forbidden classification run as one statement.
+        """
+        params = dict(params, facilitator_id=facilitator_id, offering_id=offering_id)
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    WITH target AS (
+                        SELECT id, facilitator_id FROM offerings WHERE id = %(offering_id)s
+                    ), changed AS (
+                        UPDATE offerings
+                        SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = (SELECT id FROM target)
+                          AND facilitator_id = %(facilitator_id)s AND is_active = TRUE
+                        RETURNING {OFFERING_COLUMNS}
+                    )
+                    SELECT target.facilitator_id = %(facilitator_id)s AS owned, changed.*
+                    FROM target LEFT JOIN changed ON TRUE;
+                    """,
+                    params
+                )
+                status, offering = self._scoped_offering_result(cursor.fetchone(), require_active=False)
+                if status == OFFERING_OK:
+                    self._publish_offerings(cursor, facilitator_id, [offering_id])
+        except psycopg2.Error as e:
+            print(f"Error {label} offering: {e}")
+            return OFFERING_ERROR, None
+
+        if status == OFFERING_OK:
+            self._index_offering(offering)
+            self._evict_offerings(facilitator_id)
+        return status, offering
+
+    def update_offering_for_facilitator(self, facilitator_id: int, offering_id: int, update_data: dict):
+        """
+        Update the fields present in `update_data` on an active offering owned by the facilitator.
+        Returns (status, updated offering).
+        """
+        fields = [field for field in UPDATABLE_OFFERING_FIELDS if field in update_data]
+        if not fields:
+            return self.get_offering_for_facilitator(facilitator_id, offering_id)
+        set_clause = ", ".join(f"{field} = %({field})s" for field in fields)
+        return self._scoped_offering_write(
+            facilitator_id, offering_id, set_clause,
+            {field: update_data[field] for field in fields}, "updating"
+        )
+
+    def deactivate_offering_for_facilitator(self, facilitator_id: int, offering_id: int):
+        """Soft delete an active offering owned by the facilitator. Returns (status, offering)."""
+        return self._scoped_offering_write(
+            facilitator_id, offering_id, "is_active = FALSE", {}, "deactivating"
+        )
+
     def complete_onboarding(self, phone_number: str, onboarding_data: dict):
         """Create facilitator profile after onboarding completion"""
         try:
-            # Create facilitator with onboarding data
-            self.db_manager.cursor.execute(
-                """
-                INSERT INTO facilitators (phone_number, email, name, basic_info, 
-                                        professional_details, bio_about, experience, 
-                                        certifications, visual_profile, is_active, 
-                                        created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                        CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                RETURNING id;
-                """,
-                (
-                    phone_number,
-                    onboarding_data.get("email"),
-                    onboarding_data.get("name"),
-                    onboarding_data.get("basic_info"),
-                    onboarding_data.get("professional_details"),
-                    onboarding_data.get("bio_about"),
-                    onboarding_data.get("experience"),
-                    onboarding_data.get("certifications"),
-                    onboarding_data.get("visual_profile"),
-                    True
+            with self.db_manager.get_cursor() as cursor:
+                # Create facilitator with onboarding data
+                cursor.execute(
+                    """
+                    INSERT INTO facilitators (phone_number, email, name, basic_info, 
+                                            professional_details, bio_about, experience, 
+                                            certifications, visual_profile, is_active, 
+                                            created_at, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
+                            CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    RETURNING *;
+                    """,
+                    (
+                        phone_number,
+                        onboarding_data.get("email"),
+                        onboarding_data.get("name"),
+                        onboarding_data.get("basic_info"),
+                        onboarding_data.get("professional_details"),
+                        onboarding_data.get("bio_about"),
+                        onboarding_data.get("experience"),
+                        onboarding_data.get("certifications"),
+                        onboarding_data.get("visual_profile"),
+                        True
+                    )
                 )
-            )
-            facilitator_id = self.db_manager.cursor.fetchone()[0]
-            self.db_manager.connection.commit()
-            
-            # Return the newly created facilitator profile
-            return self.get_facilitator_profile(facilitator_id)
-            
+                profile = dict(cursor.fetchone())
+                self._publish_facilitator(cursor, profile['id'], phone_number)
+
         except psycopg2.Error as e:
             print(f"Error completing onboarding: {e}")
             return None
+        self._evict_facilitator(profile['id'], phone_number)
+        # Return the newly created facilitator profile
+        return profile
+
+# Process-wide shared manager so every blueprint borrows from the same pool
+_shared_db_manager = None
+_shared_db_manager_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    """Return the process-wide DatabaseManager, creating its pool on first use"""
+    global _shared_db_manager
+    if _shared_db_manager is None:
+        with _shared_db_manager_lock:
+            if _shared_db_manager is None:
+                _shared_db_manager = DatabaseManager()
+    return _shared_db_manager
 
 # Usage example
 if __name__ == "__main__":
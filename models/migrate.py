@@ -0,0 +1,123 @@
+import argparse
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Arbitrary constant so concurrent runners (e.g. several deploy hosts) serialize
+MIGRATION_LOCK_ID = 7261548301
+
+_MIGRATION_FILE = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+
+class Migration:
+    def __init__(self, version: int, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def read_sql(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+class MigrationRunner:
+    """Applies ordered SQL files from models/migrations and records them in schema_migrations"""
+
+    def __init__(self, db_manager, migrations_dir: str = MIGRATIONS_DIR):
+        self.db_manager = db_manager
+        self.migrations_dir = migrations_dir
+
+    def discover(self):
+        """Return migration files sorted by version"""
+        migrations = []
+        for filename in os.listdir(self.migrations_dir):
+            match = _MIGRATION_FILE.match(filename)
+            if match:
+                migrations.append(Migration(
+                    int(match.group(1)), match.group(2), os.path.join(self.migrations_dir, filename)
+                ))
+        migrations.sort(key=lambda m: m.version)
+
+        versions = [m.version for m in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError(f"Duplicate migration versions in {self.migrations_dir}")
+        return migrations
+
+    def _ensure_versions_table(self, cursor):
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            """
+        )
+
+    def applied_versions(self):
+        """Versions already recorded in schema_migrations"""
+        with self.db_manager.get_cursor() as cursor:
+            self._ensure_versions_table(cursor)
+            cursor.execute("SELECT version FROM schema_migrations ORDER BY version;")
+            return {row[0] for row in cursor.fetchall()}
+
+    def pending(self):
+        applied = self.applied_versions()
+        return [m for m in self.discover() if m.version not in applied]
+
+    def upgrade(self, target: int = None):
+        """Apply pending migrations up to `target`; each one commits with its version row"""
+        applied = []
+        for migration in self.pending():
+            if target is not None and migration.version > target:
+                break
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s);", (MIGRATION_LOCK_ID,))
+                # Another runner may have applied it while we waited for the lock
+                cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s;", (migration.version,))
+                if cursor.fetchone():
+                    continue
+                logger.info(f"Applying migration {migration.version:04d}_{migration.name}")
+                cursor.execute(migration.read_sql())
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                    (migration.version, migration.name)
+                )
+            applied.append(migration)
+        return applied
+
+    def status(self):
+        """List every known migration with whether it has been applied"""
+        applied = self.applied_versions()
+        return [
+            {"version": m.version, "name": m.name, "applied": m.version in applied}
+            for m in self.discover()
+        ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the facilitator database schema")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = subparsers.add_parser("upgrade", help="Apply pending migrations")
+    upgrade_parser.add_argument("--target", type=int, help="Stop after this migration version")
+    subparsers.add_parser("status", help="Show applied and pending migrations")
+    args = parser.parse_args(argv)
+
+    from models.database import get_db_manager
+
+    runner = MigrationRunner(get_db_manager())
+    if args.command == "upgrade":
+        applied = runner.upgrade(args.target)
+        if applied:
+            for migration in applied:
+                print(f"Applied {migration.version:04d}_{migration.name}")
+        else:
+            print("Database schema is up to date")
+    else:
+        for entry in runner.status():
+            state = "applied" if entry["applied"] else "pending"
+            print(f"{entry['version']:04d}_{entry['name']}: {state}")
+
+if __name__ == "__main__":
+    main()
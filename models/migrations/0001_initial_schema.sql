@@ -0,0 +1,42 @@
+-- Baseline schema previously created by DatabaseManager._setup_tables.
+-- Uses IF NOT EXISTS so databases created before migrations existed adopt it cleanly.
+
+CREATE TABLE IF NOT EXISTS facilitators (
+    id SERIAL PRIMARY KEY,
+    phone_number VARCHAR(20) UNIQUE NOT NULL,
+    email VARCHAR(255),
+    name VARCHAR(255),
+    basic_info JSONB,
+    professional_details JSONB,
+    bio_about JSONB,
+    experience JSONB,
+    certifications JSONB,
+    visual_profile JSONB,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS phone_otps (
+    id SERIAL PRIMARY KEY,
+    phone_number VARCHAR(20) NOT NULL,
+    otp VARCHAR(6) NOT NULL,
+    otp_type VARCHAR(20) NOT NULL DEFAULT 'verification', -- 'verification' for unified flow
+    expires_at TIMESTAMP NOT NULL,
+    is_verified BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS offerings (
+    id SERIAL PRIMARY KEY,
+    facilitator_id INTEGER NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    category VARCHAR(100),
+    basic_info JSONB,
+    details JSONB,
+    price_schedule JSONB,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,30 @@
+-- Indexes for the repository's hot lookups.
+-- facilitators.phone_number is already covered by its UNIQUE constraint index,
+-- and verify_offering_ownership (id + facilitator_id) is served by the primary key.
+
+-- get_facilitator_offerings: active offerings of one facilitator
+CREATE INDEX IF NOT EXISTS idx_offerings_facilitator_active
+    ON offerings (facilitator_id)
+    WHERE is_active = TRUE;
+
+-- Statistics and reactivation look at a facilitator's offerings in every state
+CREATE INDEX IF NOT EXISTS idx_offerings_facilitator_id
+    ON offerings (facilitator_id);
+
+-- search_offerings / search_facilitators: newest active rows first
+CREATE INDEX IF NOT EXISTS idx_offerings_active_created_at
+    ON offerings (created_at DESC)
+    WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_facilitators_active_created_at
+    ON facilitators (created_at DESC)
+    WHERE is_active = TRUE;
+
+-- verify_otp / verify_otp_and_get_user_status: unverified codes for a phone number
+CREATE INDEX IF NOT EXISTS idx_phone_otps_lookup
+    ON phone_otps (phone_number, otp, expires_at)
+    WHERE is_verified = FALSE;
+
+-- cleanup_expired_otps
+CREATE INDEX IF NOT EXISTS idx_phone_otps_expires_at
+    ON phone_otps (expires_at);
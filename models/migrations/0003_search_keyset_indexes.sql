@@ -0,0 +1,13 @@
+-- Keyset pagination for public search orders by (created_at, id) so pages are
+-- stable while rows are inserted. These replace the created_at-only indexes from 0002.
+
+CREATE INDEX IF NOT EXISTS idx_offerings_active_created_id
+    ON offerings (created_at DESC, id DESC)
+    WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_facilitators_active_created_id
+    ON facilitators (created_at DESC, id DESC)
+    WHERE is_active = TRUE;
+
+DROP INDEX IF EXISTS idx_offerings_active_created_at;
+DROP INDEX IF EXISTS idx_facilitators_active_created_at;
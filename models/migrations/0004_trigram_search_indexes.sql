@@ -0,0 +1,25 @@
+-- Trigram GIN indexes so the public search's `column ILIKE '%term%'` filters
+-- (and the word_similarity ranking) no longer scan every active row.
+-- Terms shorter than three characters still fall back to a scan.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_facilitators_name_trgm
+    ON facilitators USING gin (name gin_trgm_ops)
+    WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_facilitators_email_trgm
+    ON facilitators USING gin (email gin_trgm_ops)
+    WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_offerings_title_trgm
+    ON offerings USING gin (title gin_trgm_ops)
+    WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_offerings_description_trgm
+    ON offerings USING gin (description gin_trgm_ops)
+    WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_offerings_category_trgm
+    ON offerings USING gin (category gin_trgm_ops)
+    WHERE is_active = TRUE;
@@ -0,0 +1,32 @@
+-- Full-text search over offerings: a trigger-maintained tsvector weighted
+-- title (A) > category (B) > description (C) > string values inside details (D).
+
+CREATE OR REPLACE FUNCTION offerings_search_vector(
+    p_title TEXT, p_category TEXT, p_description TEXT, p_details JSONB
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(p_title, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(p_category, '')), 'B')
+        || setweight(to_tsvector('english', COALESCE(p_description, '')), 'C')
+        || setweight(jsonb_to_tsvector('english', COALESCE(p_details, '{}'::jsonb), '["string"]'), 'D');
+$$ LANGUAGE SQL IMMUTABLE;
+
+ALTER TABLE offerings ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION offerings_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := offerings_search_vector(NEW.title, NEW.category, NEW.description, NEW.details);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_offerings_search_vector ON offerings;
+CREATE TRIGGER trg_offerings_search_vector
+    BEFORE INSERT OR UPDATE OF title, category, description, details ON offerings
+    FOR EACH ROW EXECUTE FUNCTION offerings_search_vector_update();
+
+UPDATE offerings
+SET search_vector = offerings_search_vector(title, category, description, details);
+
+CREATE INDEX IF NOT EXISTS idx_offerings_search_vector
+    ON offerings USING gin (search_vector)
+    WHERE is_active = TRUE;
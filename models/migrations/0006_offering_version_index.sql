@@ -0,0 +1,9 @@
+-- get_offerings_version (ETag checks on a facilitator's offering list) reads only
+-- updated_at of the active rows; carrying it in the partial index allows an
+-- index-only scan instead of fetching every offering row.
+CREATE INDEX IF NOT EXISTS idx_offerings_facilitator_active_version
+    ON offerings (facilitator_id) INCLUDE (updated_at)
+    WHERE is_active = TRUE;
+
+-- Supersedes the key-only partial index from 0002
+DROP INDEX IF EXISTS idx_offerings_facilitator_active;
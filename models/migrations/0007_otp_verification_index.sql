@@ -0,0 +1,10 @@
+-- verify_otp / verify_otp_and_get_user_status claim the newest unverified code for a
+-- phone number in a single UPDATE. Keying on (phone_number, otp, otp_type) with
+-- created_at DESC lets that lookup read one index entry in ORDER BY order;
+-- expires_at is carried so the expiry check needs no extra heap visit.
+CREATE INDEX IF NOT EXISTS idx_phone_otps_verification
+    ON phone_otps (phone_number, otp, otp_type, created_at DESC) INCLUDE (expires_at)
+    WHERE is_verified = FALSE;
+
+-- Supersedes the lookup index from 0002
+DROP INDEX IF EXISTS idx_phone_otps_lookup;
@@ -0,0 +1,52 @@
+-- Range-partition phone_otps by day of created_at so expired codes are removed by
+-- dropping whole partitions (python -m models.otp_partitions maintain) instead of
+-- row-by-row DELETEs that leave the busiest insert table bloated.
+-- Codes only live for minutes, so just the ones still valid are carried over.
+
+ALTER TABLE phone_otps RENAME TO phone_otps_legacy;
+ALTER SEQUENCE phone_otps_id_seq OWNED BY NONE;
+
+CREATE TABLE phone_otps (
+    id INTEGER NOT NULL DEFAULT nextval('phone_otps_id_seq'),
+    phone_number VARCHAR(20) NOT NULL,
+    otp VARCHAR(6) NOT NULL,
+    otp_type VARCHAR(20) NOT NULL DEFAULT 'verification',
+    expires_at TIMESTAMP NOT NULL,
+    is_verified BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE phone_otps_id_seq OWNED BY phone_otps.id;
+
+-- Daily partitions named phone_otps_pYYYYMMDD from yesterday to a week ahead;
+-- the maintenance job keeps creating them from here on
+DO $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN SELECT generate_series(CURRENT_DATE - 1, CURRENT_DATE + 7, INTERVAL '1 day')::date LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF phone_otps FOR VALUES FROM (%L) TO (%L)',
+            'phone_otps_p' || to_char(day, 'YYYYMMDD'), day, day + 1
+        );
+    END LOOP;
+END $$;
+
+-- Catches inserts if maintenance stops running before the premade partitions run out
+CREATE TABLE IF NOT EXISTS phone_otps_default PARTITION OF phone_otps DEFAULT;
+
+INSERT INTO phone_otps (id, phone_number, otp, otp_type, expires_at, is_verified, created_at)
+SELECT id, phone_number, otp, otp_type, expires_at, is_verified, COALESCE(created_at, CURRENT_TIMESTAMP)
+FROM phone_otps_legacy
+WHERE expires_at > NOW();
+
+DROP TABLE phone_otps_legacy;
+
+-- The partition key has to be part of the primary key
+ALTER TABLE phone_otps ADD PRIMARY KEY (id, created_at);
+
+-- Recreated from 0007 on the partitioned table (and so on every partition). The expires_at
+-- index from 0002 went with the old table: expired rows are no longer deleted by range.
+CREATE INDEX IF NOT EXISTS idx_phone_otps_verification
+    ON phone_otps (phone_number, otp, otp_type, created_at DESC) INCLUDE (expires_at)
+    WHERE is_verified = FALSE;
@@ -0,0 +1,50 @@
+-- Per-facilitator counter of offering changes, used as the ETag version of offering lists.
+-- (COUNT(*), MAX(updated_at)) missed changes: updated_at is the writing transaction's start
+-- time, so an update committed after a newer one could leave both values unchanged.
+-- Statement-level triggers bump the counter inside the writing transaction, once per
+-- facilitator per statement, so bulk writes cost one upsert per facilitator.
+
+CREATE TABLE IF NOT EXISTS offering_versions (
+    facilitator_id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION offerings_bump_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO offering_versions (facilitator_id, version)
+        SELECT DISTINCT facilitator_id, 1 FROM new_rows ORDER BY facilitator_id
+        ON CONFLICT (facilitator_id) DO UPDATE SET version = offering_versions.version + 1;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO offering_versions (facilitator_id, version)
+        SELECT facilitator_id, 1 FROM (
+            SELECT facilitator_id FROM new_rows UNION SELECT facilitator_id FROM old_rows
+        ) changed ORDER BY facilitator_id
+        ON CONFLICT (facilitator_id) DO UPDATE SET version = offering_versions.version + 1;
+    ELSE
+        INSERT INTO offering_versions (facilitator_id, version)
+        SELECT DISTINCT facilitator_id, 1 FROM old_rows ORDER BY facilitator_id
+        ON CONFLICT (facilitator_id) DO UPDATE SET version = offering_versions.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_offerings_version_insert ON offerings;
+CREATE TRIGGER trg_offerings_version_insert
+    AFTER INSERT ON offerings
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION offerings_bump_version();
+
+DROP TRIGGER IF EXISTS trg_offerings_version_update ON offerings;
+CREATE TRIGGER trg_offerings_version_update
+    AFTER UPDATE ON offerings
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION offerings_bump_version();
+
+DROP TRIGGER IF EXISTS trg_offerings_version_delete ON offerings;
+CREATE TRIGGER trg_offerings_version_delete
+    AFTER DELETE ON offerings
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION offerings_bump_version();
+
@@ -0,0 +1,232 @@
+import argparse
+import os
+import re
+import threading
+import logging
+from datetime import date, timedelta
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+# Catch-all partition created by migration 0008 for rows outside every daily range
+DEFAULT_PARTITION = 'phone_otps_default'
+
+# Arbitrary constant so maintenance runs in several workers or hosts don't overlap
+PARTITION_LOCK_ID = 7261548302
+
+_PARTITION_NAME = re.compile(r'^phone_otps_p(\d{8})$')
+
+def partition_name(day: date) -> str:
+    """Name of the phone_otps partition holding codes created on `day`"""
+    return f"phone_otps_p{day:%Y%m%d}"
+
+def maintenance_settings():
+    """Premake and retention days from OTP_PARTITION_PREMAKE_DAYS / OTP_PARTITION_RETENTION_DAYS"""
+    return {
+        "premake_days": int(os.getenv('OTP_PARTITION_PREMAKE_DAYS', 7)),
+        "retention_days": int(os.getenv('OTP_PARTITION_RETENTION_DAYS', 1))
+    }
+
+class OtpPartitionManager:
+    """
+    Maintains the daily partitions of phone_otps (migration 0008): creates the partitions
+    for today and the next `premake_days` days, and drops whole partitions once every
+    code in them has expired, i.e. days more than `retention_days` before today.
+    Codes live minutes, so a partition is safe to drop a day after it closes.
+    """
+
+    def __init__(self, db_manager, premake_days: int = 7, retention_days: int = 1):
+        self.db_manager = db_manager
+        self.premake_days = premake_days
+        self.retention_days = max(retention_days, 1)
+
+    def _partitions(self, cursor):
+        """{day: name} of the daily partitions currently attached, plus whether the default one exists"""
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'phone_otps'::regclass;
+            """
+        )
+        daily = {}
+        has_default = False
+        for (name,) in cursor.fetchall():
+            match = _PARTITION_NAME.match(name)
+            if match:
+                daily[date(int(match.group(1)[:4]), int(match.group(1)[4:6]), int(match.group(1)[6:]))] = name
+            elif name == DEFAULT_PARTITION:
+                has_default = True
+        return daily, has_default
+
+    def maintain(self):
+        """
+        Create upcoming partitions and drop expired ones in one transaction.
+        Returns what was done, or None on a database error.
+        """
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s), CURRENT_DATE;", (PARTITION_LOCK_ID,))
+                locked, today = cursor.fetchone()
+                if not locked:
+                    return {"skipped": True, "created": [], "dropped": [], "rows_dropped": 0, "default_rows": None}
+
+                daily, has_default = self._partitions(cursor)
+
+                created = []
+                for offset in range(self.premake_days + 1):
+                    day = today + timedelta(days=offset)
+                    if day in daily:
+                        continue
+                    if has_default:
+                        # Postgres refuses a partition whose range already has rows in the default one
+                        cursor.execute(
+                            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s);",
+                            (day, day + timedelta(days=1))
+                        )
+                        if cursor.fetchone()[0]:
+                            logger.warning(f"Not creating {partition_name(day)}: its rows are in {DEFAULT_PARTITION}")
+                            continue
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF phone_otps "
+                        "FOR VALUES FROM (%s) TO (%s);",
+                        (day, day + timedelta(days=1))
+                    )
+                    created.append(partition_name(day))
+
+                cutoff = today - timedelta(days=self.retention_days)
+                dropped = []
+                rows_dropped = 0
+                for day, name in sorted(daily.items()):
+                    if day >= cutoff:
+                        break
+                    cursor.execute(f"SELECT count(*) FROM {name};")
+                    rows_dropped += cursor.fetchone()[0]
+                    cursor.execute(f"DROP TABLE {name};")
+                    dropped.append(name)
+
+                default_rows = None
+                if has_default:
+                    # Stragglers written while no daily partition existed; normally none
+                    cursor.execute(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < %s;", (cutoff,))
+                    rows_dropped += cursor.rowcount
+                    cursor.execute(f"SELECT count(*) FROM {DEFAULT_PARTITION};")
+                    default_rows = cursor.fetchone()[0]
+        except psycopg2.Error as e:
+            print(f"Error maintaining OTP partitions: {e}")
+            return None
+
+        if created or dropped:
+            logger.info(
+                f"OTP partitions: created {len(created)}, dropped {len(dropped)} ({rows_dropped} rows)"
+            )
+        return {
+            "skipped": False,
+            "created": created,
+            "dropped": dropped,
+            "rows_dropped": rows_dropped,
+            "default_rows": default_rows
+        }
+
+    def status(self):
+        """Every attached partition with its row count, oldest first"""
+        with self.db_manager.get_cursor() as cursor:
+            daily, has_default = self._partitions(cursor)
+            names = [name for _, name in sorted(daily.items())] + ([DEFAULT_PARTITION] if has_default else [])
+            partitions = []
+            for name in names:
+                cursor.execute(f"SELECT count(*) FROM {name};")
+                partitions.append({"name": name, "rows": cursor.fetchone()[0]})
+            return partitions
+
+class OtpPartitionScheduler:
+    """Background thread running OtpPartitionManager.maintain() at startup and every `interval` seconds"""
+
+    def __init__(self, manager: OtpPartitionManager, interval: float = 3600):
+        self.manager = manager
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.errors = 0
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self.rows_dropped = 0
+        self.last_result = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="otp-partition-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.manager.maintain()
+            except Exception as e:
+                logger.error(f"OTP partition maintenance failed: {e}")
+                result = None
+            self.runs += 1
+            if result is None:
+                self.errors += 1
+            else:
+                self.partitions_created += len(result["created"])
+                self.partitions_dropped += len(result["dropped"])
+                self.rows_dropped += result["rows_dropped"]
+                self.last_result = result
+            self._stop.wait(self.interval)
+
+    def stats(self):
+        return {
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "errors": self.errors,
+            "partitions_created": self.partitions_created,
+            "partitions_dropped": self.partitions_dropped,
+            "rows_dropped": self.rows_dropped,
+            "last_result": self.last_result
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the daily partitions of phone_otps")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    maintain_parser = subparsers.add_parser("maintain", help="Create upcoming partitions and drop expired ones")
+    maintain_parser.add_argument("--premake-days", type=int, help="Days ahead to create partitions for")
+    maintain_parser.add_argument("--retention-days", type=int, help="Days to keep partitions after they close")
+    subparsers.add_parser("status", help="List partitions and their row counts")
+    args = parser.parse_args(argv)
+
+    from models.database import get_db_manager
+
+    settings = maintenance_settings()
+    if args.command == "maintain":
+        if args.premake_days is not None:
+            settings["premake_days"] = args.premake_days
+        if args.retention_days is not None:
+            settings["retention_days"] = args.retention_days
+    manager = OtpPartitionManager(get_db_manager(), **settings)
+
+    if args.command == "maintain":
+        result = manager.maintain()
+        if result is None:
+            raise SystemExit(1)
+        if result["skipped"]:
+            print("Another maintenance run holds the lock; nothing done")
+            return
+        print(f"Created {len(result['created'])} partitions: {', '.join(result['created']) or '-'}")
+        print(f"Dropped {len(result['dropped'])} partitions ({result['rows_dropped']} rows): "
+              f"{', '.join(result['dropped']) or '-'}")
+        if result["default_rows"]:
+            print(f"{result['default_rows']} rows are in {DEFAULT_PARTITION}")
+    else:
+        for partition in manager.status():
+            print(f"{partition['name']}: {partition['rows']} rows")
+
+if __name__ == "__main__":
+    main()
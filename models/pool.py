@@ -0,0 +1,111 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """
+    Raised when no pooled connection frees up within the checkout timeout.
+    An OperationalError, so the repository's `except psycopg2.Error` handlers report it
+    like a failed connection instead of letting it escape as a server error.
+    """
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool with bounded checkout waits and usage stats.
+    Wraps psycopg2's ThreadedConnectionPool, which fails immediately when exhausted,
+    with a semaphore so callers queue for up to `timeout` seconds instead.
+    """
+
+    def __init__(self, dsn, min_size: int = 1, max_size: int = 10, timeout: float = 5.0, **connect_kwargs):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pool = pg_pool.ThreadedConnectionPool(min_size, max_size, dsn, **connect_kwargs)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._total_wait = 0.0
+
+    def getconn(self, timeout: float = None):
+        """Check out a connection, waiting up to `timeout` seconds for a free slot"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._waits += 1
+            if not self._slots.acquire(timeout=timeout):
+                with self._lock:
+                    self._timeouts += 1
+                raise PoolTimeoutError(
+                    f"No database connection available after {timeout:.1f}s "
+                    f"(max_size={self.max_size})"
+                )
+
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._total_wait += time.monotonic() - started
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection; broken connections are discarded instead of reused"""
+        close = close or bool(conn.closed)
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                if close:
+                    self._discarded += 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """Context manager that checks a connection out and always returns it"""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def stats(self):
+        """Snapshot of pool configuration and usage counters"""
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "timeout_seconds": self.timeout,
+                "in_use": self._in_use,
+                "idle": len(self._pool._pool),
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "avg_wait_ms": round(self._total_wait * 1000 / self._checkouts, 3) if self._checkouts else 0.0
+            }
+
+    def closeall(self):
+        """Close every pooled connection"""
+        self._pool.closeall()
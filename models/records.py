@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+def _compile_to_dict(columns: tuple):
+    """Build a to_dict() that reads each slot directly (no per-column loop or getattr)"""
+    body = ", ".join(f"{column!r}: self.{column}" for column in columns)
+    namespace = {}
+    exec(f"def to_dict(self):\n    return {{{body}}}", namespace)
+    return namespace['to_dict']
+
+def record(cls):
+    """Make `cls` a slotted dataclass row record whose fields are its table columns, in SELECT order"""
+    cls = dataclass(slots=True)(cls)
+    cls.to_dict = _compile_to_dict(cls.__slots__)
+    return cls
+
+class Record:
+    """
+    Base of the row records built from plain tuple cursors with cls(*row).
+    A record stores its columns in slots instead of a per-row dict, and supports the
+    read-only mapping access callers use on rows: row['id'], row.get('name'), dict(row).
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, column) for column in self.__slots__]
+
+    def items(self):
+        return [(column, getattr(self, column)) for column in self.__slots__]
+
+    def to_dict(self):
+        return {column: getattr(self, column) for column in self.__slots__}
+
+    @classmethod
+    def columns(cls):
+        """Comma-separated column list in field order, for the SELECTs feeding cls(*row)"""
+        return ", ".join(cls.__slots__)
+
+@record
+class Facilitator(Record):
+    id: int
+    phone_number: str
+    email: str
+    name: str
+    basic_info: dict
+    professional_details: dict
+    bio_about: dict
+    experience: dict
+    certifications: dict
+    visual_profile: dict
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+@record
+class Offering(Record):
+    id: int
+    facilitator_id: int
+    title: str
+    description: str
+    category: str
+    basic_info: dict
+    details: dict
+    price_schedule: dict
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
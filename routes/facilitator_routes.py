@@ -1,14 +1,31 @@
 from flask import Blueprint, request, jsonify, session
-from models.database import DatabaseManager, FacilitatorRepository
+from models.database import (
+    FacilitatorRepository, get_db_manager,
+    OFFERING_ERROR, OFFERING_FORBIDDEN, OFFERING_NOT_FOUND, UPDATABLE_OFFERING_FIELDS
+)
+from helpers.search_index import get_offering_search_index
+from helpers.cache import get_repository_cache
+from helpers.cache_events import cache_events_enabled
 from middleware.session_required import session_required, onboarding_session_required
+from helpers.etag import client_has, make_etag, not_modified, with_etag
+from helpers.json_provider import json_passthrough_enabled, passthrough_response
+from helpers.search_cache import clean_term, create_search_cache, normalize_term
+from helpers.pagination import InvalidCursorError, decode_cursor, keyset_page
+from helpers.fulltext import build_tsquery
 import logging
 
 # Create blueprint
 facilitator_bp = Blueprint('facilitator', __name__)
 
 # Initialize database
-db_manager = DatabaseManager()
-facilitator_repo = FacilitatorRepository(db_manager)
+db_manager = get_db_manager()
+offering_search_index = get_offering_search_index()
+facilitator_repo = FacilitatorRepository(
+    db_manager, search_index=offering_search_index, cache=get_repository_cache(),
+    notify=cache_events_enabled()
+)
+# Public search responses, stored in the repository cache when enabled so writes invalidate them
+search_cache = create_search_cache(facilitator_repo.cache)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +42,12 @@ def get_facilitator_profile():
     try:
         facilitator_id = request.facilitator_id
         
+        # Answer a poll whose copy is still current from the profile version alone
+        if request.if_none_match:
+            version = facilitator_repo.get_profile_version(facilitator_id)
+            if version and client_has(make_etag('profile', *version)):
+                return not_modified(make_etag('profile', *version))
+        
         profile = facilitator_repo.get_facilitator_profile(facilitator_id)
         
         if not profile:
@@ -33,10 +56,10 @@ def get_facilitator_profile():
                 "message": "Facilitator profile not found"
             }), 404
         
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "profile": profile
-        }), 200
+        }), make_etag('profile', profile['id'], profile['updated_at'])), 200
         
     except Exception as e:
         logger.error(f"Error fetching facilitator profile: {e}")
@@ -71,11 +94,11 @@ def update_facilitator_profile():
             "visual_profile": data.get("visual_profile")
         }
         
-        # Update the profile
-        facilitator_repo.update_facilitator_profile(facilitator_id, update_data)
+        # Update the profile; the repository returns the updated row
+        updated_profile = facilitator_repo.update_facilitator_profile(facilitator_id, update_data)
         
-        # Return updated profile
-        updated_profile = facilitator_repo.get_facilitator_profile(facilitator_id)
+        if not updated_profile:
+            raise RuntimeError("profile update returned no row")
         
         return jsonify({
             "success": True,
@@ -148,13 +171,30 @@ def get_facilitator_offerings():
     try:
         facilitator_id = request.facilitator_id
         
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
-        
-        return jsonify({
+        # Answer a poll whose copy is still current from the offerings version alone
+        if request.if_none_match:
+            version = facilitator_repo.get_offerings_version(facilitator_id)
+            if version is not None and client_has(make_etag('offerings', version)):
+                return not_modified(make_etag('offerings', version))
+        
+        # Passthrough: Postgres builds the offerings JSON and it is sent without decoding
+        if json_passthrough_enabled():
+            result = facilitator_repo.get_facilitator_offerings_json(facilitator_id)
+            if result is None:
+                raise RuntimeError("database error while fetching offerings")
+            offerings_json, count, version = result
+            return with_etag(
+                passthrough_response({"offerings": offerings_json}, success=True, count=count),
+                make_etag('offerings', version)
+            ), 200
+        
+        offerings, version = facilitator_repo.get_versioned_offerings(facilitator_id)
+        
+        return with_etag(jsonify({
             "success": True,
             "offerings": offerings,
             "count": len(offerings)
-        }), 200
+        }), make_etag('offerings', version)), 200
         
     except Exception as e:
         logger.error(f"Error fetching facilitator offerings: {e}")
@@ -197,9 +237,9 @@ def create_offering():
         }
         
         # Create the offering
-        offering_id = facilitator_repo.create_offering(facilitator_id, offering_data)
+        offering = facilitator_repo.create_offering(facilitator_id, offering_data)
         
-        if not offering_id:
+        if not offering:
             return jsonify({
                 "error": "Creation failed",
                 "message": "Failed to create offering"
@@ -208,7 +248,8 @@ def create_offering():
         return jsonify({
             "success": True,
             "message": "Offering created successfully",
-            "offering_id": offering_id
+            "offering_id": offering['id'],
+            "offering": offering
         }), 201
         
     except Exception as e:
@@ -220,24 +261,24 @@ def create_offering():
 
 @facilitator_bp.route('/offerings/<int:offering_id>', methods=['GET'])
 @session_required
-def get_offering_details():
+def get_offering_details(offering_id):
     """Get details of a specific offering (must belong to current facilitator)"""
     try:
         facilitator_id = request.facilitator_id
-        offering_id = request.view_args['offering_id']
         
-        # Verify ownership
-        if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
+        # Ownership check and lookup in one query
+        status, offering = facilitator_repo.get_offering_for_facilitator(facilitator_id, offering_id)
+        
+        if status == OFFERING_ERROR:
+            raise RuntimeError("database error while fetching offering")
+        
+        if status == OFFERING_FORBIDDEN:
             return jsonify({
                 "error": "Access denied",
                 "message": "You don't have permission to access this offering"
             }), 403
         
-        # Get offering details from the facilitator's offerings
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
-        offering = next((o for o in offerings if o['id'] == offering_id), None)
-        
-        if not offering:
+        if status == OFFERING_NOT_FOUND:
             return jsonify({
                 "error": "Offering not found",
                 "message": "Offering not found"
@@ -257,11 +298,10 @@ def get_offering_details():
 
 @facilitator_bp.route('/offerings/<int:offering_id>', methods=['PUT'])
 @session_required
-def update_offering():
+def update_offering(offering_id):
     """Update a specific offering (must belong to current facilitator)"""
     try:
         facilitator_id = request.facilitator_id
-        offering_id = request.view_args['offering_id']
         data = request.get_json()
         
         if not data:
@@ -270,29 +310,31 @@ def update_offering():
                 "message": "Request body is required"
             }), 400
         
-        # Verify ownership
-        if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
+        # Prepare update data (fields omitted from the body are left unchanged)
+        update_data = {field: data[field] for field in UPDATABLE_OFFERING_FIELDS if field in data}
+        
+        # Ownership check and update in one statement
+        status, offering = facilitator_repo.update_offering_for_facilitator(facilitator_id, offering_id, update_data)
+        
+        if status == OFFERING_ERROR:
+            raise RuntimeError("database error while updating offering")
+        
+        if status == OFFERING_FORBIDDEN:
             return jsonify({
                 "error": "Access denied",
                 "message": "You don't have permission to update this offering"
             }), 403
         
-        # Prepare update data
-        update_data = {
-            "title": data.get("title"),
-            "description": data.get("description"),
-            "category": data.get("category"),
-            "basic_info": data.get("basic_info"),
-            "details": data.get("details"),
-            "price_schedule": data.get("price_schedule")
-        }
-        
-        # Update the offering
-        facilitator_repo.update_offering(offering_id, update_data)
+        if status == OFFERING_NOT_FOUND:
+            return jsonify({
+                "error": "Offering not found",
+                "message": "Offering not found"
+            }), 404
         
         return jsonify({
             "success": True,
-            "message": "Offering updated successfully"
+            "message": "Offering updated successfully",
+            "offering": offering
         }), 200
         
     except Exception as e:
@@ -304,22 +346,28 @@ def update_offering():
 
 @facilitator_bp.route('/offerings/<int:offering_id>', methods=['DELETE'])
 @session_required
-def delete_offering():
+def delete_offering(offering_id):
     """Soft delete a specific offering (must belong to current facilitator)"""
     try:
         facilitator_id = request.facilitator_id
-        offering_id = request.view_args['offering_id']
         
-        # Verify ownership
-        if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
+        # Ownership check and soft delete in one statement
+        status, _ = facilitator_repo.deactivate_offering_for_facilitator(facilitator_id, offering_id)
+        
+        if status == OFFERING_ERROR:
+            raise RuntimeError("database error while deleting offering")
+        
+        if status == OFFERING_FORBIDDEN:
             return jsonify({
                 "error": "Access denied",
                 "message": "You don't have permission to delete this offering"
             }), 403
         
-        # Soft delete by setting is_active to False
-        update_data = {"is_active": False}
-        facilitator_repo.update_offering(offering_id, {"is_active": False})
+        if status == OFFERING_NOT_FOUND:
+            return jsonify({
+                "error": "Offering not found",
+                "message": "Offering not found or already inactive"
+            }), 404
         
         return jsonify({
             "success": True,
@@ -337,13 +385,28 @@ def delete_offering():
 # PUBLIC SEARCH ENDPOINTS (No authentication required)
 # ================================================================================
 
+def _search_rows(rows):
+    """Turn a repository search error into an exception so it is reported and never cached"""
+    if rows is None:
+        raise RuntimeError("database error while searching")
+    return rows
+
+def _cached_search(key: tuple, search):
+    """Serve a public search body through the result cache, with matching Cache-Control"""
+    if search_cache is None:
+        return jsonify(search()), 200
+    response = jsonify(search_cache.get_or_compute(key, search))
+    response.headers['Cache-Control'] = search_cache.cache_control
+    return response, 200
+
 @facilitator_bp.route('/search', methods=['GET'])
 def search_facilitators():
     """Public endpoint to search facilitators"""
     try:
-        # Get query parameters
-        name = request.args.get('name', '')
-        email = request.args.get('email', '')
+        # Get query parameters, trimmed and with collapsed spacing so each cache key
+        # stands for exactly one query
+        name = clean_term(request.args.get('name', ''))
+        email = clean_term(request.args.get('email', ''))
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
         
@@ -360,18 +423,59 @@ def search_facilitators():
         if email:
             filters['email'] = email
         
-        # Search facilitators
-        facilitators = facilitator_repo.search_facilitators(filters, page, limit)
+        # rank=similarity orders the same matches by trigram similarity to the terms
+        ranked = request.args.get('rank', '').lower() == 'similarity'
         
-        return jsonify({
-            "success": True,
-            "facilitators": facilitators,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "count": len(facilitators)
+        # Cursor mode: an opaque `cursor` (empty for the first page) replaces `page`
+        cursor = request.args.get('cursor')
+        if cursor is not None and ranked:
+            return jsonify({
+                "error": "Invalid parameters",
+                "message": "rank=similarity cannot be combined with cursor pagination"
+            }), 400
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor) if cursor else None
+            except InvalidCursorError:
+                return jsonify({
+                    "error": "Invalid cursor",
+                    "message": "Use the next_cursor value from a previous response"
+                }), 400
+            
+            def search():
+                # Fetch one extra row to know whether another page exists
+                rows = _search_rows(facilitator_repo.search_facilitators(filters, limit=limit + 1, after=after))
+                facilitators, next_cursor = keyset_page(rows, limit)
+                return {
+                    "success": True,
+                    "facilitators": facilitators,
+                    "pagination": {
+                        "limit": limit,
+                        "count": len(facilitators),
+                        "next_cursor": next_cursor
+                    }
+                }
+            
+            return _cached_search(
+                ('facilitators', normalize_term(name), normalize_term(email), 'cursor', cursor, limit), search
+            )
+        
+        # Search facilitators
+        def search():
+            facilitators = _search_rows(facilitator_repo.search_facilitators(filters, page, limit, ranked=ranked))
+            return {
+                "success": True,
+                "facilitators": facilitators,
+                "pagination": {
+                    "page": page,
+                    "limit": limit,
+                    "count": len(facilitators)
+                }
             }
-        }), 200
+        
+        return _cached_search(
+            ('facilitators', normalize_term(name), normalize_term(email), 'page', page, limit, ranked), search
+        )
         
     except Exception as e:
         logger.error(f"Error searching facilitators: {e}")
@@ -384,10 +488,11 @@ def search_facilitators():
 def search_offerings():
     """Public endpoint to search offerings"""
     try:
-        # Get query parameters
-        title = request.args.get('title', '')
-        description = request.args.get('description', '')
-        category = request.args.get('category', '')
+        # Get query parameters, trimmed and with collapsed spacing so each cache key
+        # stands for exactly one query
+        title = clean_term(request.args.get('title', ''))
+        description = clean_term(request.args.get('description', ''))
+        category = clean_term(request.args.get('category', ''))
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
         
@@ -405,19 +510,93 @@ def search_offerings():
             filters['description'] = description
         if category:
             filters['category'] = category
+        # Cache key form of the filters: the searches ignore case
+        terms = (normalize_term(title), normalize_term(description), normalize_term(category))
         
-        # Search offerings
-        offerings = facilitator_repo.search_offerings(filters, page, limit)
+        # Full-text mode: `q` replaces the per-field filters and ranks by relevance
+        q = request.args.get('q', '').strip()
+        if q:
+            if request.args.get('cursor') is not None:
+                return jsonify({
+                    "error": "Invalid parameters",
+                    "message": "Full-text search (q) cannot be combined with cursor pagination"
+                }), 400
+            
+            tsquery = build_tsquery(q)
+            if not tsquery:
+                return jsonify({
+                    "error": "Invalid query",
+                    "message": "Search query has no searchable terms"
+                }), 400
+            
+            def search():
+                # Served from the in-memory BM25 index when enabled and fresh, else Postgres
+                offerings = None
+                if offering_search_index is not None:
+                    offerings = offering_search_index.search(q, page, limit)
+                if offerings is None:
+                    offerings = _search_rows(facilitator_repo.search_offerings_fulltext(tsquery, page, limit))
+                return {
+                    "success": True,
+                    "offerings": offerings,
+                    "pagination": {
+                        "page": page,
+                        "limit": limit,
+                        "count": len(offerings)
+                    }
+                }
+            
+            return _cached_search(('offerings', 'q', normalize_term(q), page, limit), search)
+        
+        # rank=similarity orders the same matches by trigram similarity to the terms
+        ranked = request.args.get('rank', '').lower() == 'similarity'
+        
+        # Cursor mode: an opaque `cursor` (empty for the first page) replaces `page`
+        cursor = request.args.get('cursor')
+        if cursor is not None and ranked:
+            return jsonify({
+                "error": "Invalid parameters",
+                "message": "rank=similarity cannot be combined with cursor pagination"
+            }), 400
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor) if cursor else None
+            except InvalidCursorError:
+                return jsonify({
+                    "error": "Invalid cursor",
+                    "message": "Use the next_cursor value from a previous response"
+                }), 400
+            
+            def search():
+                # Fetch one extra row to know whether another page exists
+                rows = _search_rows(facilitator_repo.search_offerings(filters, limit=limit + 1, after=after))
+                offerings, next_cursor = keyset_page(rows, limit)
+                return {
+                    "success": True,
+                    "offerings": offerings,
+                    "pagination": {
+                        "limit": limit,
+                        "count": len(offerings),
+                        "next_cursor": next_cursor
+                    }
+                }
+            
+            return _cached_search(('offerings', *terms, 'cursor', cursor, limit), search)
         
-        return jsonify({
-            "success": True,
-            "offerings": offerings,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "count": len(offerings)
+        # Search offerings
+        def search():
+            offerings = _search_rows(facilitator_repo.search_offerings(filters, page, limit, ranked=ranked))
+            return {
+                "success": True,
+                "offerings": offerings,
+                "pagination": {
+                    "page": page,
+                    "limit": limit,
+                    "count": len(offerings)
+                }
             }
-        }), 200
+        
+        return _cached_search(('offerings', *terms, 'page', page, limit, ranked), search)
         
     except Exception as e:
         logger.error(f"Error searching offerings: {e}")
@@ -437,19 +616,22 @@ def get_dashboard_data():
     try:
         facilitator_id = request.facilitator_id
         
-        # Get facilitator profile
-        profile = facilitator_repo.get_facilitator_profile(facilitator_id)
+        # Profile, offerings and counters in a single round trip
+        dashboard = facilitator_repo.get_facilitator_dashboard(facilitator_id)
         
-        # Get facilitator offerings
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
+        if not dashboard:
+            return jsonify({
+                "error": "Profile not found",
+                "message": "Facilitator profile not found"
+            }), 404
         
         # Prepare dashboard data
         dashboard_data = {
-            "profile": profile,
+            "profile": dashboard["profile"],
             "offerings": {
-                "total": len(offerings),
-                "active": len([o for o in offerings if o.get('is_active', True)]),
-                "items": offerings
+                "total": dashboard["total_offerings"],
+                "active": dashboard["active_offerings"],
+                "items": dashboard["offerings"]
             },
             "session_info": {
                 "facilitator_id": facilitator_id,
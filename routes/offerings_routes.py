@@ -1,19 +1,40 @@
 from flask import Blueprint, request, jsonify
-from models.database import DatabaseManager, FacilitatorRepository
+from models.database import (
+    FacilitatorRepository, get_db_manager, UPDATABLE_OFFERING_FIELDS, OFFERING_STAT_DIMENSIONS,
+    OFFERING_ERROR, OFFERING_FORBIDDEN, OFFERING_NOT_FOUND, OFFERING_OK
+)
+from helpers.search_index import get_offering_search_index
+from helpers.cache import get_repository_cache
+from helpers.cache_events import cache_events_enabled
+from helpers.etag import client_has, make_etag, not_modified, with_etag
+from helpers.json_provider import json_passthrough_enabled, passthrough_response
 from middleware.session_required import session_required
+import json
 import logging
+import os
 
 # Create blueprint
 offerings_bp = Blueprint('offerings', __name__)
 
 # Initialize database
-db_manager = DatabaseManager()
-facilitator_repo = FacilitatorRepository(db_manager)
+db_manager = get_db_manager()
+offering_search_index = get_offering_search_index()
+facilitator_repo = FacilitatorRepository(
+    db_manager, search_index=offering_search_index, cache=get_repository_cache(),
+    notify=cache_events_enabled()
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows per UPDATE ... FROM (VALUES ...) statement in bulk updates
+BULK_UPDATE_BATCH_SIZE = int(os.getenv('BULK_UPDATE_BATCH_SIZE', 500))
+MAX_BULK_BATCH_SIZE = 5000
+
+# Upper bound on offerings accepted by one bulk create request
+MAX_BULK_CREATE = int(os.getenv('MAX_BULK_CREATE', 5000))
+
 # ================================================================================
 # OFFERING MANAGEMENT ENDPOINTS (Alternative organization)
 # ================================================================================
@@ -29,8 +50,31 @@ def list_offerings():
         category = request.args.get('category')
         active_only = request.args.get('active', 'true').lower() == 'true'
         
-        # Get all offerings for the facilitator
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
+        # Answer a poll whose copy is still current from the offerings version alone
+        if request.if_none_match:
+            version = facilitator_repo.get_offerings_version(facilitator_id)
+            if version is not None and client_has(make_etag('offerings', category, active_only, version)):
+                return not_modified(make_etag('offerings', category, active_only, version))
+        
+        filters = {
+            "category": category,
+            "active_only": active_only
+        }
+        
+        # Passthrough: Postgres filters and builds the offerings JSON, sent without decoding
+        if json_passthrough_enabled():
+            result = facilitator_repo.get_facilitator_offerings_json(facilitator_id, category or None)
+            if result is None:
+                raise RuntimeError("database error while listing offerings")
+            offerings_json, count, version = result
+            return with_etag(
+                passthrough_response({"offerings": offerings_json}, success=True, count=count, filters=filters),
+                make_etag('offerings', category, active_only, version)
+            ), 200
+        
+        # Get all offerings for the facilitator, with the version the ETag is built from
+        offerings, version = facilitator_repo.get_versioned_offerings(facilitator_id)
+        etag = make_etag('offerings', category, active_only, version)
         
         # Apply filters
         if category:
@@ -41,15 +85,12 @@ def list_offerings():
             # For now, the repository only returns active offerings
             pass
         
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "offerings": offerings,
             "count": len(offerings),
-            "filters": {
-                "category": category,
-                "active_only": active_only
-            }
-        }), 200
+            "filters": filters
+        }), etag), 200
         
     except Exception as e:
         logger.error(f"Error listing offerings: {e}")
@@ -58,6 +99,38 @@ def list_offerings():
             "message": "Failed to list offerings"
         }), 500
 
+def _prepare_offering(data):
+    """
+    Validate a new offering payload and normalize it for the repository.
+    Returns (offering_data, None) or (None, error body).
+    """
+    # Validate required fields
+    required_fields = ['title']
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    
+    if missing_fields:
+        return None, {
+            "error": "Missing required fields",
+            "message": f"Required fields: {', '.join(missing_fields)}"
+        }
+    
+    # Validate data types and constraints
+    if not isinstance(data['title'], str) or len(data['title']) > 255:
+        return None, {
+            "error": "Invalid data",
+            "message": "Title cannot exceed 255 characters"
+        }
+    
+    # Prepare offering data
+    return {
+        "title": data.get("title").strip(),
+        "description": (data.get("description") or "").strip(),
+        "category": (data.get("category") or "").strip(),
+        "basic_info": data.get("basic_info"),
+        "details": data.get("details"),
+        "price_schedule": data.get("price_schedule")
+    }, None
+
 @offerings_bp.route('/', methods=['POST'])
 @session_required
 def create_new_offering():
@@ -72,46 +145,20 @@ def create_new_offering():
                 "message": "Request body is required"
             }), 400
         
-        # Validate required fields
-        required_fields = ['title']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            return jsonify({
-                "error": "Missing required fields",
-                "message": f"Required fields: {', '.join(missing_fields)}"
-            }), 400
-        
-        # Validate data types and constraints
-        if len(data.get('title', '')) > 255:
-            return jsonify({
-                "error": "Invalid data",
-                "message": "Title cannot exceed 255 characters"
-            }), 400
-        
-        # Prepare offering data
-        offering_data = {
-            "title": data.get("title").strip(),
-            "description": data.get("description", "").strip(),
-            "category": data.get("category", "").strip(),
-            "basic_info": data.get("basic_info"),
-            "details": data.get("details"),
-            "price_schedule": data.get("price_schedule")
-        }
+        offering_data, error = _prepare_offering(data)
+        if error:
+            return jsonify(error), 400
         
         # Create the offering
-        offering_id = facilitator_repo.create_offering(facilitator_id, offering_data)
+        # The repository returns the stored row, so no follow-up read is needed
+        created_offering = facilitator_repo.create_offering(facilitator_id, offering_data)
         
-        if not offering_id:
+        if not created_offering:
             return jsonify({
                 "error": "Creation failed",
                 "message": "Failed to create offering"
             }), 500
         
-        # Get the created offering details
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
-        created_offering = next((o for o in offerings if o['id'] == offering_id), None)
-        
         return jsonify({
             "success": True,
             "message": "Offering created successfully",
@@ -132,27 +179,34 @@ def get_offering_by_id(offering_id):
     try:
         facilitator_id = request.facilitator_id
         
-        # Verify ownership
-        if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
+        # Answer a poll whose copy is still current from the offering version alone
+        if request.if_none_match:
+            version = facilitator_repo.get_offering_version(facilitator_id, offering_id)
+            if version and client_has(make_etag('offering', *version)):
+                return not_modified(make_etag('offering', *version))
+        
+        # Ownership check and lookup in one query
+        status, offering = facilitator_repo.get_offering_for_facilitator(facilitator_id, offering_id)
+        
+        if status == OFFERING_ERROR:
+            raise RuntimeError("database error while fetching offering")
+        
+        if status == OFFERING_FORBIDDEN:
             return jsonify({
                 "error": "Access denied",
                 "message": "You don't have permission to access this offering"
             }), 403
         
-        # Get offering details
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
-        offering = next((o for o in offerings if o['id'] == offering_id), None)
-        
-        if not offering:
+        if status == OFFERING_NOT_FOUND:
             return jsonify({
                 "error": "Offering not found",
                 "message": "Offering not found or inactive"
             }), 404
         
-        return jsonify({
+        return with_etag(jsonify({
             "success": True,
             "offering": offering
-        }), 200
+        }), make_etag('offering', offering['id'], offering['updated_at'])), 200
         
     except Exception as e:
         logger.error(f"Error fetching offering: {e}")
@@ -175,13 +229,6 @@ def update_offering_by_id(offering_id):
                 "message": "Request body is required"
             }), 400
         
-        # Verify ownership
-        if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
-            return jsonify({
-                "error": "Access denied",
-                "message": "You don't have permission to update this offering"
-            }), 403
-        
         # Validate data constraints
         if data.get('title') and len(data.get('title', '')) > 255:
             return jsonify({
@@ -206,12 +253,25 @@ def update_offering_by_id(offering_id):
                 "message": "No updatable fields provided"
             }), 400
         
-        # Update the offering
-        facilitator_repo.update_offering(offering_id, update_data)
+        # Ownership check and update in one statement
+        status, updated_offering = facilitator_repo.update_offering_for_facilitator(
+            facilitator_id, offering_id, update_data
+        )
+        
+        if status == OFFERING_ERROR:
+            raise RuntimeError("database error while updating offering")
         
-        # Get updated offering
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
-        updated_offering = next((o for o in offerings if o['id'] == offering_id), None)
+        if status == OFFERING_FORBIDDEN:
+            return jsonify({
+                "error": "Access denied",
+                "message": "You don't have permission to update this offering"
+            }), 403
+        
+        if status == OFFERING_NOT_FOUND:
+            return jsonify({
+                "error": "Offering not found",
+                "message": "Offering not found or inactive"
+            }), 404
         
         return jsonify({
             "success": True,
@@ -233,47 +293,28 @@ def delete_offering_by_id(offering_id):
     try:
         facilitator_id = request.facilitator_id
         
-        # Verify ownership
-        if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
+        # Ownership check and soft delete in one statement
+        status, _ = facilitator_repo.deactivate_offering_for_facilitator(facilitator_id, offering_id)
+        
+        if status == OFFERING_ERROR:
+            raise RuntimeError("database error while deleting offering")
+        
+        if status == OFFERING_FORBIDDEN:
             return jsonify({
                 "error": "Access denied",
                 "message": "You don't have permission to delete this offering"
             }), 403
         
-        # Check if offering exists and is active
-        offerings = facilitator_repo.get_facilitator_offerings(facilitator_id)
-        offering = next((o for o in offerings if o['id'] == offering_id), None)
-        
-        if not offering:
+        if status == OFFERING_NOT_FOUND:
             return jsonify({
                 "error": "Offering not found",
                 "message": "Offering not found or already inactive"
             }), 404
         
-        # Soft delete by setting is_active to False
-        # Note: We need to add this method to the repository or use a workaround
-        try:
-            # Prepare update data to deactivate
-            update_data = {"is_active": False}
-            facilitator_repo.update_offering(offering_id, update_data)
-            
-            return jsonify({
-                "success": True,
-                "message": "Offering deleted successfully"
-            }), 200
-            
-        except Exception:
-            # Fallback: Update with empty data but mark as inactive through direct DB access
-            db_manager.cursor.execute(
-                "UPDATE offerings SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                (offering_id,)
-            )
-            db_manager.connection.commit()
-            
-            return jsonify({
-                "success": True,
-                "message": "Offering deleted successfully"
-            }), 200
+        return jsonify({
+            "success": True,
+            "message": "Offering deleted successfully"
+        }), 200
         
     except Exception as e:
         logger.error(f"Error deleting offering: {e}")
@@ -289,24 +330,15 @@ def activate_offering(offering_id):
     try:
         facilitator_id = request.facilitator_id
         
-        # Verify ownership (need to check even inactive offerings)
-        db_manager.cursor.execute(
-            "SELECT 1 FROM offerings WHERE id = %s AND facilitator_id = %s",
-            (offering_id, facilitator_id)
-        )
-        
-        if not db_manager.cursor.fetchone():
+        # Verify ownership (checks inactive offerings too)
+        if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
             return jsonify({
                 "error": "Access denied",
                 "message": "You don't have permission to access this offering"
             }), 403
         
         # Reactivate the offering
-        db_manager.cursor.execute(
-            "UPDATE offerings SET is_active = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-            (offering_id,)
-        )
-        db_manager.connection.commit()
+        facilitator_repo.activate_offering(offering_id)
         
         return jsonify({
             "success": True,
@@ -331,59 +363,39 @@ def get_offering_statistics():
     try:
         facilitator_id = request.facilitator_id
         
-        # Get all offerings (including inactive for stats)
-        db_manager.cursor.execute(
-            """
-            SELECT 
-                COUNT(*) as total_offerings,
-                COUNT(CASE WHEN is_active = TRUE THEN 1 END) as active_offerings,
-                COUNT(CASE WHEN is_active = FALSE THEN 1 END) as inactive_offerings,
-                COUNT(DISTINCT category) as unique_categories,
-                category,
-                COUNT(*) as category_count
-            FROM offerings 
-            WHERE facilitator_id = %s 
-            GROUP BY category
-            """,
-            (facilitator_id,)
-        )
+        # Extra breakdowns, e.g. ?breakdown=status,month; categories are always included
+        requested = [d.strip() for d in request.args.get('breakdown', '').split(',') if d.strip()]
+        unknown = [d for d in requested if d not in OFFERING_STAT_DIMENSIONS]
+        if unknown:
+            return jsonify({
+                "error": "Invalid breakdown",
+                "message": f"Supported breakdowns: {', '.join(OFFERING_STAT_DIMENSIONS)}"
+            }), 400
         
-        category_stats = db_manager.cursor.fetchall()
-        
-        # Get overall stats
-        db_manager.cursor.execute(
-            """
-            SELECT 
-                COUNT(*) as total_offerings,
-                COUNT(CASE WHEN is_active = TRUE THEN 1 END) as active_offerings,
-                COUNT(CASE WHEN is_active = FALSE THEN 1 END) as inactive_offerings,
-                COUNT(DISTINCT category) as unique_categories
-            FROM offerings 
-            WHERE facilitator_id = %s
-            """,
-            (facilitator_id,)
-        )
+        dimensions = ['category'] + [d for d in dict.fromkeys(requested) if d != 'category']
+        result = facilitator_repo.get_offering_statistics(facilitator_id, dimensions)
         
-        overall_stats = db_manager.cursor.fetchone()
+        if result is None:
+            return jsonify({
+                "error": "Server error",
+                "message": "Failed to fetch offering statistics"
+            }), 500
         
         # Format category breakdown
         categories = []
-        for row in category_stats:
-            if row['category']:  # Skip null categories
+        for row in result['breakdowns']['category']:
+            if row['value']:  # Skip null categories
                 categories.append({
-                    "category": row['category'],
-                    "count": row['category_count']
+                    "category": row['value'],
+                    "count": row['total_offerings']
                 })
         
         stats = {
-            "overall": {
-                "total_offerings": overall_stats['total_offerings'],
-                "active_offerings": overall_stats['active_offerings'],
-                "inactive_offerings": overall_stats['inactive_offerings'],
-                "unique_categories": overall_stats['unique_categories']
-            },
+            "overall": result['overall'],
             "categories": categories
         }
+        if len(dimensions) > 1:
+            stats["breakdowns"] = {d: result['breakdowns'][d] for d in dimensions[1:]}
         
         return jsonify({
             "success": True,
@@ -401,6 +413,100 @@ def get_offering_statistics():
 # BULK OPERATIONS
 # ================================================================================
 
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+def _read_bulk_create_items():
+    """Parse a JSON array, {"offerings": [...]} or NDJSON request body into a list of items"""
+    if request.mimetype in NDJSON_MIMETYPES:
+        items = []
+        for line_number, line in enumerate(request.stream, start=1):
+            if len(items) > MAX_BULK_CREATE:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Line {line_number} is not valid JSON")
+        return items
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('offerings')
+    if not isinstance(data, list):
+        raise ValueError("Body must be a JSON array of offerings, {\"offerings\": [...]} or NDJSON")
+    return data
+
+@offerings_bp.route('/bulk/create', methods=['POST'])
+@session_required
+def bulk_create_offerings():
+    """Create many offerings at once (e.g. a catalog imported from another platform)"""
+    try:
+        facilitator_id = request.facilitator_id
+        
+        try:
+            items = _read_bulk_create_items()
+        except ValueError as e:
+            return jsonify({
+                "error": "Invalid data",
+                "message": str(e)
+            }), 400
+        
+        if not items:
+            return jsonify({
+                "error": "No data provided",
+                "message": "At least one offering is required"
+            }), 400
+        
+        if len(items) > MAX_BULK_CREATE:
+            return jsonify({
+                "error": "Too many offerings",
+                "message": f"A bulk create accepts at most {MAX_BULK_CREATE} offerings"
+            }), 400
+        
+        # Validate every row like a single create; nothing is inserted if any row fails
+        offerings = []
+        errors = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({"index": index, "error": "Invalid data", "message": "Each offering must be an object"})
+                continue
+            offering_data, error = _prepare_offering(item)
+            if error:
+                errors.append({"index": index, **error})
+            else:
+                offerings.append(offering_data)
+        
+        if errors:
+            return jsonify({
+                "error": "Invalid data",
+                "message": f"{len(errors)} of {len(items)} offerings failed validation; none were created",
+                "errors": errors
+            }), 400
+        
+        offering_ids = facilitator_repo.bulk_create_offerings(facilitator_id, offerings)
+        
+        if offering_ids is None:
+            return jsonify({
+                "error": "Creation failed",
+                "message": "Failed to create offerings"
+            }), 500
+        
+        return jsonify({
+            "success": True,
+            "message": f"Created {len(offering_ids)} offerings",
+            "created_count": len(offering_ids),
+            "offering_ids": offering_ids
+        }), 201
+        
+    except Exception as e:
+        logger.error(f"Error in bulk create: {e}")
+        return jsonify({
+            "error": "Server error",
+            "message": "Failed to perform bulk create"
+        }), 500
+
 @offerings_bp.route('/bulk/update', methods=['PUT'])
 @session_required
 def bulk_update_offerings():
@@ -423,41 +529,97 @@ def bulk_update_offerings():
                 "message": "Offerings must be an array"
             }), 400
         
-        updated_count = 0
-        errors = []
+        # "best_effort" (default) applies every valid item; "atomic" applies all or nothing
+        mode = data.get('mode', 'best_effort')
+        if mode not in ('best_effort', 'atomic'):
+            return jsonify({
+                "error": "Invalid data",
+                "message": "mode must be 'best_effort' or 'atomic'"
+            }), 400
+        atomic = mode == 'atomic'
+        
+        batch_size = data.get('batch_size', BULK_UPDATE_BATCH_SIZE)
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size < 1:
+            return jsonify({
+                "error": "Invalid data",
+                "message": "batch_size must be a positive integer"
+            }), 400
+        batch_size = min(batch_size, MAX_BULK_BATCH_SIZE)
         
+        # Validate items; repeated IDs merge in order so later fields win, as if applied one by one
+        results = []
+        updates = {}
         for offering_data in offerings_to_update:
-            if 'id' not in offering_data:
-                errors.append("Missing ID for offering")
+            if not isinstance(offering_data, dict) or 'id' not in offering_data:
+                results.append({"id": None, "status": "invalid", "error": "Missing ID for offering"})
                 continue
             
             offering_id = offering_data['id']
-            
-            # Verify ownership
-            if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
-                errors.append(f"Access denied for offering ID {offering_id}")
+            if not isinstance(offering_id, int) or isinstance(offering_id, bool):
+                results.append({"id": offering_id, "status": "invalid", "error": f"Invalid offering ID {offering_id!r}"})
                 continue
             
-            # Prepare update data
-            update_data = {}
-            updatable_fields = ['title', 'description', 'category', 'basic_info', 'details', 'price_schedule']
+            update_data = {field: offering_data[field] for field in UPDATABLE_OFFERING_FIELDS if field in offering_data}
+            title = update_data.get('title', '')
+            if 'title' in update_data and (not isinstance(title, str) or not title.strip()):
+                error = "Title cannot be empty"
+            elif isinstance(title, str) and len(title) > 255:
+                error = "Title cannot exceed 255 characters"
+            elif not update_data:
+                error = "No updatable fields provided"
+            else:
+                error = None
             
-            for field in updatable_fields:
-                if field in offering_data:
-                    update_data[field] = offering_data[field]
+            if error:
+                results.append({"id": offering_id, "status": "invalid", "error": f"Invalid data for offering ID {offering_id}: {error}"})
+                continue
             
-            if update_data:
-                try:
-                    facilitator_repo.update_offering(offering_id, update_data)
-                    updated_count += 1
-                except Exception as e:
-                    errors.append(f"Failed to update offering ID {offering_id}: {str(e)}")
+            updates.setdefault(offering_id, {}).update(update_data)
+            results.append({"id": offering_id, "status": None})
+        
+        invalid = [r for r in results if r["status"] == "invalid"]
+        if atomic and invalid:
+            statuses = {}
+        else:
+            # Ownership check and all updates run in one transaction
+            statuses, _ = facilitator_repo.bulk_update_offerings(
+                facilitator_id, updates, atomic=atomic, batch_size=batch_size
+            )
+        
+        for result in results:
+            if result["status"] == "invalid":
+                continue
+            status = statuses.get(result["id"], OFFERING_ERROR if statuses else "skipped")
+            if status == OFFERING_OK:
+                result["status"] = "updated"
+            elif status == OFFERING_FORBIDDEN:
+                result["status"] = "forbidden"
+                result["error"] = f"Access denied for offering ID {result['id']}"
+            elif status == OFFERING_ERROR:
+                result["status"] = "failed"
+                result["error"] = f"Failed to update offering ID {result['id']}"
+            else:
+                result["status"] = "skipped"
+        
+        updated_count = len({r["id"] for r in results if r["status"] == "updated"})
+        errors = [r["error"] for r in results if r.get("error")]
+        
+        if atomic and errors:
+            return jsonify({
+                "success": False,
+                "error": "Bulk update rejected",
+                "message": "No offerings were updated because at least one item failed",
+                "updated_count": 0,
+                "errors": errors,
+                "results": results
+            }), 500 if any(r["status"] == "failed" for r in results) else 400
         
         return jsonify({
             "success": True,
             "message": f"Bulk update completed. Updated {updated_count} offerings.",
             "updated_count": updated_count,
-            "errors": errors
+            "errors": errors,
+            "results": results
         }), 200
         
     except Exception as e:
@@ -467,55 +629,57 @@ def bulk_update_offerings():
             "message": "Failed to perform bulk update"
         }), 500
 
+def _bulk_set_active(active):
+    """Shared body of bulk delete/activate: one UPDATE for every id, outcomes derived per id"""
+    verb, count_key = ("activate", "activated_count") if active else ("delete", "deleted_count")
+    facilitator_id = request.facilitator_id
+    data = request.get_json()
+    
+    if not data or 'offering_ids' not in data:
+        return jsonify({
+            "error": "Invalid data",
+            "message": "Array of offering IDs is required"
+        }), 400
+    
+    offering_ids = data['offering_ids']
+    
+    if not isinstance(offering_ids, list):
+        return jsonify({
+            "error": "Invalid data",
+            "message": "offering_ids must be an array"
+        }), 400
+    
+    errors = []
+    valid_ids = []
+    for offering_id in offering_ids:
+        if not isinstance(offering_id, int) or isinstance(offering_id, bool):
+            errors.append(f"Invalid offering ID {offering_id!r}")
+        elif offering_id not in valid_ids:
+            valid_ids.append(offering_id)
+    
+    changed_ids = facilitator_repo.set_offerings_active(facilitator_id, valid_ids, active) if valid_ids else []
+    if changed_ids is None:
+        raise RuntimeError(f"database error during bulk {verb}")
+    
+    # Anything not returned by the UPDATE was missing or owned by someone else
+    changed = set(changed_ids)
+    failed_ids = [offering_id for offering_id in valid_ids if offering_id not in changed]
+    errors.extend(f"Access denied for offering ID {offering_id}" for offering_id in failed_ids)
+    
+    return jsonify({
+        "success": True,
+        "message": f"Bulk {verb} completed. {verb.capitalize()}d {len(changed)} offerings.",
+        count_key: len(changed),
+        "failed_ids": failed_ids,
+        "errors": errors
+    }), 200
+
 @offerings_bp.route('/bulk/delete', methods=['DELETE'])
 @session_required
 def bulk_delete_offerings():
     """Soft delete multiple offerings at once"""
     try:
-        facilitator_id = request.facilitator_id
-        data = request.get_json()
-        
-        if not data or 'offering_ids' not in data:
-            return jsonify({
-                "error": "Invalid data",
-                "message": "Array of offering IDs is required"
-            }), 400
-        
-        offering_ids = data['offering_ids']
-        
-        if not isinstance(offering_ids, list):
-            return jsonify({
-                "error": "Invalid data",
-                "message": "offering_ids must be an array"
-            }), 400
-        
-        deleted_count = 0
-        errors = []
-        
-        for offering_id in offering_ids:
-            # Verify ownership
-            if not facilitator_repo.verify_offering_ownership(facilitator_id, offering_id):
-                errors.append(f"Access denied for offering ID {offering_id}")
-                continue
-            
-            try:
-                # Soft delete
-                db_manager.cursor.execute(
-                    "UPDATE offerings SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                    (offering_id,)
-                )
-                deleted_count += 1
-            except Exception as e:
-                errors.append(f"Failed to delete offering ID {offering_id}: {str(e)}")
-        
-        db_manager.connection.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": f"Bulk delete completed. Deleted {deleted_count} offerings.",
-            "deleted_count": deleted_count,
-            "errors": errors
-        }), 200
+        return _bulk_set_active(False)
         
     except Exception as e:
         logger.error(f"Error in bulk delete: {e}")
@@ -523,3 +687,17 @@ def bulk_delete_offerings():
             "error": "Server error",
             "message": "Failed to perform bulk delete"
         }), 500
+
+@offerings_bp.route('/bulk/activate', methods=['PUT'])
+@session_required
+def bulk_activate_offerings():
+    """Reactivate multiple previously deactivated offerings at once"""
+    try:
+        return _bulk_set_active(True)
+        
+    except Exception as e:
+        logger.error(f"Error in bulk activate: {e}")
+        return jsonify({
+            "error": "Server error",
+            "message": "Failed to perform bulk activate"
+        }), 500
@@ -1,15 +1,25 @@
 from flask import Blueprint, jsonify, request, session
-from models.database import DatabaseManager, FacilitatorRepository
+from models.database import FacilitatorRepository, get_db_manager
 import random
 import re
 from datetime import datetime
-from helpers.firebase_sms import firebase_sms_service
+from helpers.sms_queue import get_sms_provider, get_sms_queue
+from helpers.cache import get_repository_cache
+from helpers.cache_events import cache_events_enabled
+from helpers.otp_store import get_otp_store
+from middleware.rate_limit import rate_limited
 
 auth_bp = Blueprint('auth', __name__)
 
+# Outbound SMS: sent by a background queue when SMS_QUEUE=true, otherwise within the request
+sms_provider = get_sms_provider()
+sms_queue = get_sms_queue()
+
 # Initialize database components
-db_manager = DatabaseManager()
-facilitator_repo = FacilitatorRepository(db_manager)
+db_manager = get_db_manager()
+facilitator_repo = FacilitatorRepository(
+    db_manager, cache=get_repository_cache(), notify=cache_events_enabled(), otp_store=get_otp_store()
+)
 
 def validate_phone_number(phone_number):
     """Validate phone number format"""
@@ -23,17 +33,18 @@ def generate_otp():
 
 def send_sms(phone_number, message):
     """
-    Send SMS via Firebase
+    Send SMS via the configured provider (SMS_PROVIDER)
     """
     try:
-        # Extract OTP from message for Firebase service
+        # Extract OTP from message for the provider
         otp = message.split(": ")[1].split(".")[0] if ": " in message else "123456"
-        return firebase_sms_service.send_otp_sms(phone_number, otp)
+        return sms_provider.send(phone_number, otp)
     except Exception as e:
-        print(f"Error sending SMS via Firebase: {e}")
+        print(f"Error sending SMS: {e}")
         return False
 
 @auth_bp.route('/send-otp', methods=['POST'])
+@rate_limited('send_otp')
 def send_otp():
     """Send OTP to phone number"""
     try:
@@ -56,6 +67,21 @@ def send_otp():
         if not otp_id:
             return jsonify({"error": "Failed to generate OTP. Please try again."}), 500
         
+        # Hand the SMS to the background senders and answer without waiting for the provider
+        if sms_queue is not None:
+            sms_id = sms_queue.enqueue(phone_number, otp)
+            if not sms_id:
+                response = jsonify({"error": "SMS service is busy. Please try again shortly."})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+            return jsonify({
+                "success": True,
+                "message": "OTP sent successfully",
+                "phone_number": phone_number,
+                "sms_id": sms_id,
+                "sms_status": "queued"
+            }), 200
+        
         # Send SMS
         sms_message = f"Your verification code is: {otp}. Valid for 10 minutes."
         if send_sms(phone_number, sms_message):
@@ -71,7 +97,21 @@ def send_otp():
         print(f"Error in send_otp: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@auth_bp.route('/sms-status/<sms_id>', methods=['GET'])
+@rate_limited('sms_status')
+def sms_status(sms_id):
+    """Delivery status of an OTP message sent through the SMS queue"""
+    if sms_queue is None:
+        return jsonify({"error": "SMS delivery status is not tracked"}), 404
+    
+    status = sms_queue.status(sms_id)
+    if status is None:
+        return jsonify({"error": "Unknown or expired SMS id"}), 404
+    
+    return jsonify({"success": True, "sms": status}), 200
+
 @auth_bp.route('/verify-otp', methods=['POST'])
+@rate_limited('verify_otp')
 def verify_otp():
     """Verify OTP and determine user flow"""
     try: